@@ -0,0 +1,19 @@
+/*
+ * CPU build of the add_arrays kernel (add.metal) behind a plain C ABI, so
+ * sidmetal.py can load it with ctypes on any platform:
+ *
+ *   cc -O3 -shared -fPIC add.c -o libsidmetal.so        (Linux)
+ *   cc -O3 -dynamiclib add.c -o libsidmetal.dylib       (macOS)
+ *
+ * A Metal-backed library exporting the same symbol drops in unchanged.
+ */
+#include <stddef.h>
+
+void add_arrays(const float *restrict inA,
+                const float *restrict inB,
+                float *restrict result,
+                size_t count)
+{
+    for (size_t index = 0; index < count; index++)
+        result[index] = inA[index] + inB[index];
+}
@@ -1,29 +1,331 @@
-import os, subprocess 
-import ctypes
+"""
+SIDMETAL - Lazy compute-backend registry for the array kernels
+==============================================================
 
+Importing this module does nothing but define functions: no prints, no
+subprocesses, no library loading. The first kernel call probes the
+backends, fastest first after a short timing run:
 
-"""
+    ctypes   a shared library exporting
+                 void add_arrays(const float *a, const float *b,
+                                 float *out, size_t n)
+             ($SIDMETAL_LIB, else libsidmetal.so / .dylib next to this
+             file; add.c builds the CPU version, a Metal-backed library
+             with the same symbol drops in)
+    numpy    vectorized float32 on the CPU
+    python   always available
+
+Each candidate must load and reproduce the pure-Python result on a small
+self-test before it is timed. The ranking is kept in-process and written
+to a small JSON cache ($SIDMETAL_CACHE, else ~/.cache/sidmetal/probe.json)
+keyed by interpreter, platform, library path/mtime and NumPy location, so
+worker processes reuse it instead of re-probing. SIDMETAL_BACKEND=<name>
+forces a backend.
+
+On a Linux box without the library (or Metal) the probe simply ends at
+numpy or python.
+
+Metal build (macOS):
 
  xcrun -sdk macosx metal -c add.metal -o add.air
  xcrun -sdk macosx metallib add.air -o add.metallib
  clang main.m \\n-framework Metal \\n-framework Foundation \\n-o add_program
  ./add_program
 
-
+USE CASE: Dispatch array kernels to the fastest backend without paying
+for the probe in every worker
 """
 
+import os
+import sys
+import time
+from array import array
+
+PROBE_SIZE = 1 << 16
+_SELF_TEST = ([1.0, 2.0, 3.0, 4.0, -0.5], [10.0, 20.0, 30.0, 40.0, 0.25])
+
+_cache = {}  # In-process: 'ranking' -> [names], name -> loaded backend
+
+
+class BackendUnavailable(RuntimeError):
+    """A backend failed to load or failed its self-test."""
+
+
+class Backend:
+    """A named set of kernels; add_arrays(a, b) -> float32 a + b."""
+
+    __slots__ = ('name', 'add_arrays')
+
+    def __init__(self, name, add_arrays):
+        self.name = name
+        self.add_arrays = add_arrays
+
+    def __repr__(self):
+        return f"Backend({self.name!r})"
+
+
+# ============================================================================
+# Backends (each loader imports / loads only when called)
+# ============================================================================
+
+def _floats(values):
+    """array('f') view of the input, copying only if it isn't one already."""
+    if isinstance(values, array) and values.typecode == 'f':
+        return values
+    return array('f', values)
+
+
+def _numpy_array(values):
+    """True for NumPy arrays, without importing NumPy to find out."""
+    return type(values).__module__ == 'numpy'
+
+
+def _load_python():
+    def add_arrays(a, b):
+        return array('f', map(float.__add__, map(float, a), map(float, b)))
+    return Backend('python', add_arrays)
+
+
+def _load_numpy():
+    try:
+        import numpy as np
+    except ImportError as error:
+        raise BackendUnavailable(str(error)) from None
+
+    def add_arrays(a, b):
+        result = np.add(np.asarray(a, dtype=np.float32), np.asarray(b, dtype=np.float32))
+        if _numpy_array(a):
+            return result
+        out = array('f')
+        out.frombytes(result.tobytes())
+        return out
+    return Backend('numpy', add_arrays)
+
+
+def library_path():
+    """Where the ctypes backend looks for its shared library."""
+    if os.environ.get('SIDMETAL_LIB'):
+        return os.environ['SIDMETAL_LIB']
+    suffix = '.dylib' if sys.platform == 'darwin' else '.so'
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'libsidmetal' + suffix)
+
+
+def _load_ctypes():
+    import ctypes
+
+    path = library_path()
+    if not os.path.exists(path):
+        raise BackendUnavailable(f"{path} not built")
+    try:
+        kernel = ctypes.CDLL(path).add_arrays
+    except (OSError, AttributeError) as error:
+        raise BackendUnavailable(str(error)) from None
+    float_p = ctypes.POINTER(ctypes.c_float)
+    kernel.argtypes = [float_p, float_p, float_p, ctypes.c_size_t]
+    kernel.restype = None
+
+    def pointer(buffer):
+        if _numpy_array(buffer):
+            return buffer.ctypes.data_as(float_p)
+        return ctypes.cast((ctypes.c_float * len(buffer)).from_buffer(buffer), float_p)
+
+    def add_arrays(a, b):
+        if _numpy_array(a):
+            import numpy as np
+            a = np.ascontiguousarray(a, dtype=np.float32)
+            b = np.ascontiguousarray(b, dtype=np.float32)
+            out = np.empty_like(a)
+        else:
+            a, b = _floats(a), _floats(b)
+            out = array('f', bytes(4 * len(a)))
+        if len(a):
+            kernel(pointer(a), pointer(b), pointer(out), len(a))
+        return out
+    return Backend('ctypes', add_arrays)
+
+
+# Probe order; the timing run decides the final ranking
+BACKENDS = {'ctypes': _load_ctypes, 'numpy': _load_numpy, 'python': _load_python}
+
+
+# ============================================================================
+# Probe + cross-process cache
+# ============================================================================
+
+def _cache_path():
+    if os.environ.get('SIDMETAL_CACHE'):
+        return os.environ['SIDMETAL_CACHE']
+    root = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(root, 'sidmetal', 'probe.json')
+
+
+def _environment_key():
+    """Changes whenever the probe could come out differently."""
+    import importlib.util
+    import platform
+
+    path = library_path()
+    try:
+        library = f"{path}:{os.stat(path).st_mtime_ns}"
+    except OSError:
+        library = f"{path}:missing"
+    spec = importlib.util.find_spec('numpy')
+    return '|'.join([sys.version, platform.platform(), library,
+                     spec.origin if spec is not None else 'no-numpy'])
+
+
+def _read_cached(key):
+    import json
+    try:
+        with open(_cache_path()) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get('key') != key:
+        return None
+    return cached.get('ranking')
+
+
+def _write_cached(key, ranking, timings):
+    import json
+    path = _cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        scratch = f"{path}.{os.getpid()}"
+        with open(scratch, 'w') as f:
+            json.dump({'key': key, 'ranking': ranking, 'seconds': timings}, f)
+        os.replace(scratch, path)  # Atomic: concurrent workers never see half a file
+    except OSError:
+        pass  # Read-only home etc.: the in-process cache still works
+
+
+def _check(backend):
+    a, b = _SELF_TEST
+    expected = list(_load_python().add_arrays(a, b))
+    if list(backend.add_arrays(array('f', a), array('f', b))) != expected:
+        raise BackendUnavailable(f"{backend.name} failed its self-test")
+
+
+def _time(backend, repeat=3):
+    a = array('f', [float(i % 1024) for i in range(PROBE_SIZE)])
+    b = array('f', [0.5] * PROBE_SIZE)
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        backend.add_arrays(a, b)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def probe(refresh=False):
+    """
+    Rank the usable backends, fastest first.
+
+    Uses the in-process result, then the on-disk cache, and only then
+    loads, self-tests and times every backend (refresh=True forces that).
+
+    Returns:
+        backend names, fastest first ('python' is always among them)
+    """
+    if not refresh and 'ranking' in _cache:
+        return _cache['ranking']
+    key = _environment_key()
+    ranking = None if refresh else _read_cached(key)
+
+    if ranking is None:
+        timings = {}
+        for name, load in BACKENDS.items():
+            try:
+                backend = load()
+                _check(backend)
+            except BackendUnavailable:
+                continue
+            _cache[name] = backend
+            timings[name] = _time(backend)
+        ranking = sorted(timings, key=timings.get)
+        _write_cached(key, ranking, timings)
+
+    _cache['ranking'] = ranking
+    return ranking
+
+
+def get_backend(name=None):
+    """
+    The backend to dispatch to: `name` if given, else $SIDMETAL_BACKEND,
+    else the fastest one the probe found.
+
+    Raises:
+        BackendUnavailable: a requested backend does not load here
+    """
+    name = name or os.environ.get('SIDMETAL_BACKEND')
+    if name is None:
+        for candidate in probe():
+            try:
+                return _backend(candidate)
+            except BackendUnavailable:
+                continue  # Stale cache entry (library removed since)
+        return _backend('python')
+    if name not in BACKENDS:
+        raise BackendUnavailable(f"unknown backend {name!r}; choose from {list(BACKENDS)}")
+    return _backend(name)
+
+
+def _backend(name):
+    backend = _cache.get(name)
+    if backend is None:
+        backend = _cache[name] = BACKENDS[name]()
+    return backend
+
+
+def available():
+    """Usable backend names, fastest first (runs the probe if needed)."""
+    return list(probe())
+
+
+def reset():
+    """Forget the in-process probe result and loaded backends."""
+    _cache.clear()
+
+
+# ============================================================================
+# Kernels
+# ============================================================================
+
+def add_arrays(a, b, backend=None):
+    """
+    Element-wise float32 a + b (the add.metal kernel).
+
+    Args:
+        a, b: equal-length float sequences (lists, array('f'), NumPy arrays)
+        backend: force a backend by name
 
-PATH = os.getcwd()
-print(PATH)
+    Returns:
+        NumPy float32 array if a is a NumPy array, otherwise array('f')
+    """
+    if len(a) != len(b):
+        raise ValueError(f"length mismatch: {len(a)} vs {len(b)}")
+    result = get_backend(backend).add_arrays(a, b)
+    if _numpy_array(a) and not _numpy_array(result):
+        import numpy as np
+        result = np.frombuffer(result, dtype=np.float32)  # python backend
+    return result
 
-proc = subprocess.Popen(
-    ["python", "--version"],
-    stdout=subprocess.PIPE,
-    text=True
-)
-out, _ = proc.communicate()
-print(out)
 
+if __name__ == "__main__":
+    ranking = available()
+    print(f"Backends, fastest first: {ranking} (cache: {_cache_path()})")
 
+    A = [1.0, 2.0, 3.0, 4.0]
+    B = [10.0, 20.0, 30.0, 40.0]
+    for name in ranking:
+        print(f"{name:7s} {list(add_arrays(A, B, backend=name))}")
+    assert list(add_arrays(A, B)) == [11.0, 22.0, 33.0, 44.0]
 
-lib_path = os.path.abspath(".")
\ No newline at end of file
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    if np is not None:
+        for name in ranking:
+            out = add_arrays(np.array(A), np.array(B), backend=name)
+            assert isinstance(out, np.ndarray) and out.dtype == np.float32, name
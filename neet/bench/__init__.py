@@ -0,0 +1,20 @@
+"""
+BENCHMARKS - Synthetic Walker constellations at realistic scale
+===============================================================
+
+    generators   reproducible Walker-delta meshes, ground-station
+                 attachments and visibility-window sets
+    runner       times and memory-profiles the note.py algorithms across
+                 size sweeps and appends JSON lines to a results file
+
+Run from the neet/ directory (the modules import note directly):
+
+    python -m bench --sizes 1000 4000 10000 --out bench_results.jsonl
+"""
+
+from bench.generators import (attach_ground_stations, isl_mesh, visibility_windows,
+                              walker_delta)
+from bench.runner import run_suite
+
+__all__ = ['walker_delta', 'isl_mesh', 'attach_ground_stations',
+           'visibility_windows', 'run_suite']
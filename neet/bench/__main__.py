@@ -0,0 +1,35 @@
+"""Command line: python -m bench [--sizes ...] [--out results.jsonl]"""
+
+import argparse
+
+from bench.runner import run_suite
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m bench',
+                                     description="Benchmark note.py on synthetic Walker constellations")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 4_000, 10_000],
+                        help="constellation sizes (satellites)")
+    parser.add_argument('--windows', type=int, nargs='+', default=None,
+                        help="visibility-window counts (default: 10x each size)")
+    parser.add_argument('--stations', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='+', default=None, metavar='FUNCTION',
+                        help="run only these functions")
+    parser.add_argument('--out', default='bench_results.jsonl',
+                        help="JSON-lines file to append to")
+    args = parser.parse_args(argv)
+
+    def report(record):
+        print(f"{record['function']:26s} size {record['size']:>8d}  "
+              f"{record['seconds'] * 1e3:10.2f} ms  {record['peak_bytes'] / 1e6:8.2f} MB peak")
+
+    records = run_suite(args.sizes, args.windows, args.stations, args.repeat, args.seed,
+                        args.out, args.only, report)
+    print(f"{len(records)} results appended to {args.out} (run {records[0]['run']})"
+          if records else "nothing to run")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Synthetic constellation data. Every generator takes a seed and returns the
+same data for the same arguments, so runs can be compared.
+"""
+
+import math
+import random
+from typing import Dict, List, Optional, Tuple
+
+from note import C_KM_PER_MS, EARTH_RADIUS_KM, geodetic_to_ecef
+
+Vector = Tuple[float, float, float]
+
+
+def walker_delta(total: int, planes: int, phasing: int = 1,
+                 inclination_deg: float = 53.0, altitude_km: float = 550.0,
+                 epoch_s: float = 0.0) -> Dict[str, Dict]:
+    """
+    Walker-delta constellation i:T/P/F on circular orbits.
+
+    Satellite (p, s) has RAAN 360 * p / P and argument of latitude
+    360 * s / S + 360 * F * p / T (S = T / P per plane), advanced by
+    epoch_s of orbital motion. Node IDs are 'SAT-<p * S + s>' - strings,
+    like the ground stations, so heap ties never compare int with str.
+
+    Returns:
+        {sat_id: {'plane', 'slot', 'position'}} with Earth-centered
+        (x, y, z) km positions (the Earth's rotation is ignored)
+    """
+    if total % planes:
+        raise ValueError("total must be a multiple of planes")
+    per_plane = total // planes
+    radius = EARTH_RADIUS_KM + altitude_km
+    mean_motion = math.sqrt(398_600.4418 / radius ** 3)  # rad/s
+    inclination = math.radians(inclination_deg)
+
+    satellites = {}
+    for p in range(planes):
+        raan = 2 * math.pi * p / planes
+        for s in range(per_plane):
+            u = (2 * math.pi * s / per_plane + 2 * math.pi * phasing * p / total
+                 + mean_motion * epoch_s)
+            position = (radius * (math.cos(raan) * math.cos(u)
+                                  - math.sin(raan) * math.sin(u) * math.cos(inclination)),
+                        radius * (math.sin(raan) * math.cos(u)
+                                  + math.cos(raan) * math.sin(u) * math.cos(inclination)),
+                        radius * math.sin(u) * math.sin(inclination))
+            satellites[f"SAT-{p * per_plane + s}"] = {'plane': p, 'slot': s, 'position': position}
+    return satellites
+
+
+def _latency(a: Vector, b: Vector, microseconds: bool) -> float:
+    ms = math.dist(a, b) / C_KM_PER_MS
+    return round(ms * 1000) if microseconds else round(ms, 3)
+
+
+def isl_mesh(satellites: Dict[str, Dict], microseconds: bool = False
+             ) -> Tuple[Dict[str, List[Tuple[str, float]]], Dict[str, Vector]]:
+    """
+    +Grid ISL mesh: two intra-plane links (slot +/- 1) and two cross-plane
+    links (same slot in planes +/- 1; the seam between the last and first
+    plane is where a Walker phasing offset would break the grid, so both
+    ends simply link to the same slot number).
+
+    Args:
+        microseconds: integer-microsecond weights instead of float ms
+
+    Returns:
+        (mesh, coords) - mesh in dijkstra()'s adjacency form, coords as
+        astar() takes them
+    """
+    planes = 1 + max(sat['plane'] for sat in satellites.values())
+    per_plane = len(satellites) // planes
+    coords = {sat_id: sat['position'] for sat_id, sat in satellites.items()}
+
+    by_slot = {(sat['plane'], sat['slot']): sat_id for sat_id, sat in satellites.items()}
+
+    mesh = {}
+    for sat_id, sat in satellites.items():
+        p, s = sat['plane'], sat['slot']
+        neighbors = {by_slot[p, (s + 1) % per_plane],
+                     by_slot[p, (s - 1) % per_plane],
+                     by_slot[(p + 1) % planes, s],
+                     by_slot[(p - 1) % planes, s]} - {sat_id}
+        mesh[sat_id] = [(v, _latency(coords[sat_id], coords[v], microseconds))
+                        for v in sorted(neighbors)]
+    return mesh, coords
+
+
+def attach_ground_stations(mesh: Dict, coords: Dict[str, Vector], count: int,
+                           links: int = 4, seed: int = 0,
+                           microseconds: bool = False) -> List[str]:
+    """
+    Add `count` ground stations 'GS-i' at random land-agnostic locations
+    within +/- 60 deg latitude, each linked both ways to its `links`
+    nearest satellites. Modifies mesh and coords in place.
+
+    Returns:
+        the ground-station node IDs
+    """
+    rng = random.Random(seed)
+    satellites = [node for node in coords if not node.startswith('GS-')]
+    stations = []
+    for i in range(count):
+        station = f"GS-{i}"
+        position = geodetic_to_ecef(rng.uniform(-60, 60), rng.uniform(-180, 180))
+        coords[station] = position
+        nearest = sorted(satellites, key=lambda sat: math.dist(position, coords[sat]))[:links]
+        mesh[station] = []
+        for sat in nearest:
+            latency = _latency(position, coords[sat], microseconds)
+            mesh[station].append((sat, latency))
+            mesh[sat].append((station, latency))
+        stations.append(station)
+    return stations
+
+
+def visibility_windows(count: int, satellites: int, horizon_s: float = 86_400,
+                       min_pass_s: float = 180, max_pass_s: float = 720,
+                       seed: int = 0, integer: bool = True,
+                       mean_overlap: Optional[float] = None
+                       ) -> List[Tuple[float, float, str]]:
+    """
+    (start, end, satellite_id) visibility windows for one terminal.
+
+    Pass starts are spread uniformly over the horizon and durations drawn
+    from [min_pass_s, max_pass_s]; mean_overlap (average number of
+    satellites in view) rescales the horizon to hit that density.
+
+    Returns:
+        windows in random order (the algorithms must sort them)
+    """
+    rng = random.Random(seed)
+    if mean_overlap is not None:
+        horizon_s = count * (min_pass_s + max_pass_s) / 2 / mean_overlap
+    windows = []
+    for _ in range(count):
+        start = rng.uniform(0, horizon_s)
+        end = start + rng.uniform(min_pass_s, max_pass_s)
+        if integer:
+            start, end = int(start), int(end)
+        windows.append((start, end, f"SAT-{rng.randrange(satellites)}"))
+    return windows
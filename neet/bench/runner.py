@@ -0,0 +1,158 @@
+"""
+Timing / memory harness for the note.py algorithms.
+
+Each case is measured twice: best-of-`repeat` wall time with
+time.perf_counter(), then one extra run under tracemalloc for the peak
+bytes allocated during the call. Inputs are built (and copied where the
+function mutates them, like merge_intervals' in-place sort) outside the
+measured region.
+
+Results are JSON lines, one record per (function, size):
+
+    {"run": ..., "function": "dijkstra", "size": 10000, "n": ..., "m": ...,
+     "seconds": ..., "peak_bytes": ..., "python": ..., "timestamp": ...}
+
+Appending to one file across runs gives a history to compare against.
+"""
+
+import gc
+import json
+import platform
+import time
+import tracemalloc
+import uuid
+from typing import Callable, Dict, Iterable, List, Optional
+
+from note import (bfs, dijkstra, dijkstra_with_path, find_coverage_gaps,
+                  max_concurrent_satellites, merge_intervals, min_handoffs_schedule,
+                  optimal_handoff_schedule)
+
+from bench.generators import attach_ground_stations, isl_mesh, visibility_windows, walker_delta
+
+
+def measure(function: Callable, make_args: Callable[[], tuple], repeat: int = 3) -> Dict:
+    """
+    Best-of-repeat seconds and tracemalloc peak bytes for function(*args).
+    make_args() builds fresh arguments for every call.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        args = make_args()
+        gc.collect()
+        started = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - started)
+
+    args = make_args()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds': best, 'peak_bytes': peak}
+
+
+def _walker_shape(satellites: int) -> int:
+    """Plane count near sqrt(T) that divides T (Starlink-like 72 x 22 etc.)."""
+    planes = max(1, round(satellites ** 0.5))
+    while satellites % planes:
+        planes -= 1
+    return planes
+
+
+def graph_cases(satellites: int, stations: int, seed: int) -> List[tuple]:
+    """(name, function, make_args, n, m) for the graph algorithms."""
+    constellation = walker_delta(satellites, _walker_shape(satellites))
+    mesh, coords = isl_mesh(constellation)
+    ground = attach_ground_stations(mesh, coords, stations, seed=seed)
+    unweighted = {u: [v for v, _ in edges] for u, edges in mesh.items()}
+    source, target = ground[0], ground[-1]
+    n = len(mesh)
+    m = sum(len(edges) for edges in mesh.values())
+    return [
+        ('dijkstra', dijkstra, lambda: (mesh, source), n, m),
+        ('dijkstra_with_path', dijkstra_with_path, lambda: (mesh, source, target), n, m),
+        ('bfs', bfs, lambda: (unweighted, source), n, m),
+    ]
+
+
+def window_cases(windows: int, satellites: int, seed: int) -> List[tuple]:
+    """(name, function, make_args, n, m) for the interval / scheduling code."""
+    triples = visibility_windows(windows, satellites, seed=seed, mean_overlap=3.0)
+    pairs = [(start, end) for start, end, _ in triples]
+    dicts = [{'id': sat, 'start': start, 'end': end} for start, end, sat in triples]
+    horizon = max(end for _, end in pairs)
+    return [
+        ('merge_intervals', merge_intervals, lambda: (list(pairs),), windows, 0),
+        ('find_coverage_gaps', find_coverage_gaps,
+         lambda: (list(pairs), 0, horizon), windows, 0),
+        ('min_handoffs_schedule', min_handoffs_schedule, lambda: (triples,), windows, 0),
+        ('optimal_handoff_schedule', optimal_handoff_schedule, lambda: (dicts,), windows, 0),
+        ('max_concurrent_satellites', max_concurrent_satellites, lambda: (pairs,), windows, 0),
+    ]
+
+
+def run_suite(sizes: Iterable[int] = (1_000, 4_000, 10_000),
+              window_sizes: Optional[Iterable[int]] = None,
+              stations: int = 50, repeat: int = 3, seed: int = 0,
+              out: Optional[str] = None,
+              functions: Optional[Iterable[str]] = None,
+              progress: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+    """
+    Run every case across the size sweeps.
+
+    Args:
+        sizes: constellation sizes (satellites) for the graph algorithms
+        window_sizes: window counts for the interval algorithms
+                      (default: 10x each constellation size)
+        stations: ground stations attached to each mesh
+        out: JSON-lines file to append results to
+        functions: restrict to these function names
+        progress: called with each record as it completes
+
+    Returns:
+        the records written
+    """
+    sizes = list(sizes)
+    window_sizes = list(window_sizes) if window_sizes is not None else [10 * s for s in sizes]
+    wanted = set(functions) if functions is not None else None
+    run = uuid.uuid4().hex[:12]
+    common = {'run': run, 'python': platform.python_version(),
+              'machine': platform.machine(), 'timestamp': time.time(), 'seed': seed}
+
+    records = []
+    plans = [(size, lambda size=size: graph_cases(size, stations, seed)) for size in sizes]
+    plans += [(size, lambda size=size: window_cases(size, 1_000, seed)) for size in window_sizes]
+    for size, build in plans:
+        for name, function, make_args, n, m in build():
+            if wanted is not None and name not in wanted:
+                continue
+            record = {**common, 'function': name, 'size': size, 'n': n, 'm': m,
+                      **measure(function, make_args, repeat)}
+            records.append(record)
+            if progress is not None:
+                progress(record)
+
+    if out is not None:
+        with open(out, 'a') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+    return records
+
+
+def load_results(path: str) -> List[Dict]:
+    """Read back every record from a results file."""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(path: str, baseline_run: str, candidate_run: str) -> Dict[tuple, float]:
+    """{(function, size): candidate seconds / baseline seconds} for two runs."""
+    by_run = {}
+    for record in load_results(path):
+        by_run.setdefault(record['run'], {})[(record['function'], record['size'])] = \
+            record['seconds']
+    base, cand = by_run[baseline_run], by_run[candidate_run]
+    return {key: cand[key] / base[key] for key in base.keys() & cand.keys() if base[key]}
@@ -0,0 +1,374 @@
+"""
+CONTRACTION HIERARCHY INDEX
+===========================
+
+One-time preprocessing over a fixed topology snapshot so that point-to-point
+queries touch only a few hundred nodes instead of a whole Dijkstra ball.
+
+Build:
+    Contract nodes one at a time in order of "importance" (twice the edge
+    difference - shortcuts needed minus edges removed - plus contracted
+    neighbors). When v is removed, every path u -> v -> x that is the ONLY
+    shortest u -> x path (checked with a small local "witness" Dijkstra,
+    capped in both settled nodes and hops) is replaced by a shortcut u -> x
+    remembering v as its middle node. Contracting v can only change the
+    priority of v's neighbors, so only those are re-evaluated; the queue
+    skips entries whose priority has since changed.
+
+Query:
+    Bidirectional Dijkstra where both searches only move UP the order,
+    with stall-on-demand: a node that a higher-ranked node already reaches
+    more cheaply (over a downward edge the search can't relax) is not
+    expanded. The best meeting node gives the distance; shortcuts are
+    unpacked back into original mesh hops.
+
+The index reports its own build time and memory, and benchmark() measures
+query speedup against dijkstra_with_path so each epoch can decide whether
+building it pays off.
+
+USE CASE: Sub-millisecond route queries on a topology that holds for seconds
+"""
+
+import heapq
+import sys
+import time
+from array import array
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+from note import INF, dijkstra_with_path, to_csr
+
+# Witness limits for the priority estimate only (contraction itself uses the
+# instance's limits): a rough shortcut count is enough to order nodes
+PRIORITY_SETTLE_LIMIT = 16
+PRIORITY_HOP_LIMIT = 2
+
+
+class ContractionHierarchy:
+    """
+    Contraction hierarchy over an adjacency dict or CSRGraph.
+
+    Args:
+        graph: {node: [(neighbor, weight), ...]} or CSRGraph
+        witness_settle_limit: max nodes a witness search may settle
+        witness_hop_limit: max edges on a witness path. Lower limits build
+            faster but may add redundant (harmless) shortcuts.
+
+    Attributes:
+        build_seconds: preprocessing wall time
+        shortcuts: number of shortcut edges added
+    """
+
+    def __init__(self, graph, witness_settle_limit: int = 128, witness_hop_limit: int = 6):
+        started = time.perf_counter()
+        csr = to_csr(graph)
+        self.node_ids = csr.node_ids
+        self.node_index = csr.node_index
+        self.witness_settle_limit = witness_settle_limit
+        self.witness_hop_limit = witness_hop_limit
+
+        n = csr.num_nodes
+        out = [dict() for _ in range(n)]
+        inn = [dict() for _ in range(n)]
+        for u in range(n):
+            for v, weight in csr.neighbors(u):
+                if u != v and weight < out[u].get(v, INF):
+                    out[u][v] = weight
+                    inn[v][u] = weight
+
+        self._middle = {}   # (u, x) -> contracted node the shortcut skips
+        self.rank = array('i', [0]) * n
+        up_forward = [None] * n
+        up_backward = [None] * n
+        deleted_neighbors = [0] * n
+
+        # Priority queue on node importance; stale entries are skipped
+        priority = [self._priority(v, out, inn, deleted_neighbors) for v in range(n)]
+        queue = [(priority[v], v) for v in range(n)]
+        heapq.heapify(queue)
+        contracted = bytearray(n)
+        next_rank = 0
+        while queue:
+            current, v = heapq.heappop(queue)
+            if contracted[v] or current != priority[v]:
+                continue
+
+            for u, x, length in self._shortcuts(v, out, inn, self.witness_settle_limit,
+                                                self.witness_hop_limit):
+                if length < out[u].get(x, INF):
+                    out[u][x] = length
+                    inn[x][u] = length
+                    self._middle[(u, x)] = v
+
+            # Everything still attached to v ranks higher: those are v's
+            # upward edges in each direction
+            up_forward[v] = list(out[v].items())
+            up_backward[v] = list(inn[v].items())
+            for x in out[v]:
+                del inn[x][v]
+            for u in inn[v]:
+                del out[u][v]
+            neighbors = out[v].keys() | inn[v].keys()
+            out[v] = inn[v] = None
+            contracted[v] = 1
+
+            self.rank[v] = next_rank
+            next_rank += 1
+
+            # Only v's neighbors lost an edge / gained shortcuts
+            for x in neighbors:
+                deleted_neighbors[x] += 1
+            for x in neighbors:
+                priority[x] = self._priority(x, out, inn, deleted_neighbors)
+                heapq.heappush(queue, (priority[x], x))
+
+        self._forward = _pack(up_forward, csr.integral)
+        self._backward = _pack(up_backward, csr.integral)
+        self.shortcuts = len(self._middle)
+        self.build_seconds = time.perf_counter() - started
+
+    # ------------------------------------------------------------------
+    # Preprocessing
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _witness(u, skip, limit, targets, out, settle_limit, hop_limit) -> Dict[int, float]:
+        """
+        Local Dijkstra from u avoiding `skip`, bounded by distance, settled
+        nodes and hops. A target it fails to reach just gets a shortcut.
+        """
+        dist = {u: 0}
+        hops = {u: 0}
+        heap = [(0, u)]
+        remaining = len(targets)
+        settled = 0
+        while heap and settled < settle_limit:
+            d, y = heapq.heappop(heap)
+            if d > dist[y]:
+                continue
+            if d > limit:
+                break
+            settled += 1
+            if y in targets:
+                remaining -= 1
+                if remaining == 0:
+                    break
+            next_hops = hops[y] + 1
+            if next_hops > hop_limit:
+                continue
+            last_hop = next_hops == hop_limit
+            for z, weight in out[y].items():
+                if z == skip or (last_hop and z not in targets):
+                    continue  # Nothing past the last hop could be a witness
+                candidate = d + weight
+                if candidate <= limit and candidate < dist.get(z, INF):
+                    dist[z] = candidate
+                    hops[z] = next_hops
+                    heapq.heappush(heap, (candidate, z))
+        return dist
+
+    def _shortcuts(self, v, out, inn, settle_limit, hop_limit) -> List[Tuple[int, int, float]]:
+        """Shortcuts u -> x needed if v were contracted now."""
+        needed = []
+        for u, w_in in inn[v].items():
+            targets = {x: w_in + w_out for x, w_out in out[v].items() if x != u}
+            if not targets:
+                continue
+            witness = self._witness(u, v, max(targets.values()), targets, out,
+                                    settle_limit, hop_limit)
+            for x, length in targets.items():
+                if witness.get(x, INF) > length:
+                    needed.append((u, x, length))
+        return needed
+
+    def _priority(self, v, out, inn, deleted_neighbors) -> int:
+        # Edge difference (weighted double) keeps the overlay sparse;
+        # contracted neighbors spread contraction evenly so the order stays
+        # shallow
+        shortcuts = self._shortcuts(v, out, inn, PRIORITY_SETTLE_LIMIT, PRIORITY_HOP_LIMIT)
+        edge_difference = len(shortcuts) - len(out[v]) - len(inn[v])
+        return 2 * edge_difference + deleted_neighbors[v]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def query(self, start: Hashable, end: Hashable) -> Tuple[float, List[Hashable]]:
+        """
+        Same contract as dijkstra_with_path(graph, start, end):
+        (shortest_distance, path) with shortcuts unpacked, or
+        (float('inf'), []) if no path exists.
+        """
+        if start == end:
+            return (0, [start])
+        index = self.node_index
+        if start not in index or end not in index:
+            return (float('inf'), [])
+        s, t = index[start], index[end]
+
+        dist = ({s: 0}, {t: 0})
+        previous = ({}, {})
+        heaps = ([(0, s)], [(0, t)])
+        graphs = (self._forward, self._backward)
+        best, meeting = INF, -1
+
+        while heaps[0] or heaps[1]:
+            for side in (0, 1):
+                heap = heaps[side]
+                if not heap:
+                    continue
+                if heap[0][0] >= best:
+                    heap.clear()  # This direction can't improve the answer
+                    continue
+                d, u = heapq.heappop(heap)
+                if d > dist[side][u]:
+                    continue
+                other = dist[1 - side].get(u)
+                if other is not None and d + other < best:
+                    best, meeting = d + other, u
+
+                # Stall-on-demand: the other direction's upward edges at u are
+                # this direction's edges from higher nodes INTO u. If one of
+                # them already gives u a shorter label, u isn't on a shortest
+                # up-path and needn't be expanded.
+                labels = dist[side]
+                indptr, indices, weights = graphs[1 - side]
+                lo, hi = indptr[u], indptr[u + 1]
+                stalled = False
+                for w, weight in zip(indices[lo:hi], weights[lo:hi]):
+                    if w in labels and labels[w] + weight < d:
+                        stalled = True
+                        break
+                if stalled:
+                    continue
+
+                indptr, indices, weights = graphs[side]
+                lo, hi = indptr[u], indptr[u + 1]
+                for v, weight in zip(indices[lo:hi], weights[lo:hi]):
+                    candidate = d + weight
+                    if candidate < labels.get(v, INF):
+                        labels[v] = candidate
+                        previous[side][v] = u
+                        heapq.heappush(heap, (candidate, v))
+
+        if meeting < 0:
+            return (float('inf'), [])
+
+        # Up-path from start to the meeting node, then down to end
+        hops = [meeting]
+        while hops[-1] != s:
+            hops.append(previous[0][hops[-1]])
+        hops.reverse()
+        node = meeting
+        while node != t:
+            node = previous[1][node]
+            hops.append(node)
+
+        ids = self.node_ids
+        path = [ids[s]]
+        for a, b in zip(hops, hops[1:]):
+            path.extend(ids[x] for x in self._unpack(a, b))
+        return (best, path)
+
+    def _unpack(self, a: int, b: int) -> List[int]:
+        """Original hops of edge a -> b, excluding a."""
+        hops = []
+        stack = [(a, b)]
+        while stack:
+            u, x = stack.pop()
+            middle = self._middle.get((u, x))
+            if middle is None:
+                hops.append(x)
+            else:
+                stack.append((middle, x))
+                stack.append((u, middle))
+        return hops
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def nbytes(self) -> int:
+        """Approximate index memory: upward CSR arrays + shortcut table."""
+        arrays = sum(len(a) * a.itemsize for a in self._forward + self._backward)
+        return arrays + len(self.rank) * self.rank.itemsize + sys.getsizeof(self._middle)
+
+    def benchmark(self, graph, pairs: Iterable[Tuple[Hashable, Hashable]]) -> Dict[str, float]:
+        """
+        Time CH queries against dijkstra_with_path on the same pairs.
+
+        Returns:
+            {'build_seconds', 'index_bytes', 'shortcuts',
+             'ch_query_seconds', 'dijkstra_query_seconds', 'speedup',
+             'break_even_queries'}  (mean seconds per query)
+
+        break_even_queries is how many queries this epoch must serve before
+        the build cost is paid back.
+        """
+        pairs = list(pairs)
+        if not pairs:
+            raise ValueError("benchmark needs at least one (start, end) pair")
+
+        started = time.perf_counter()
+        for start, end in pairs:
+            self.query(start, end)
+        ch_seconds = (time.perf_counter() - started) / len(pairs)
+
+        started = time.perf_counter()
+        for start, end in pairs:
+            dijkstra_with_path(graph, start, end)
+        dijkstra_seconds = (time.perf_counter() - started) / len(pairs)
+
+        saved = dijkstra_seconds - ch_seconds
+        return {
+            'build_seconds': self.build_seconds,
+            'index_bytes': self.nbytes(),
+            'shortcuts': self.shortcuts,
+            'ch_query_seconds': ch_seconds,
+            'dijkstra_query_seconds': dijkstra_seconds,
+            'speedup': dijkstra_seconds / ch_seconds if ch_seconds else INF,
+            'break_even_queries': self.build_seconds / saved if saved > 0 else INF,
+        }
+
+
+def _pack(rows, integral: bool):
+    """List of [(neighbor, weight), ...] rows -> (indptr, indices, weights)."""
+    indptr = array('q', [0])
+    indices = array('i')
+    weights = array('q' if integral else 'd')
+    for row in rows:
+        for v, weight in row:
+            indices.append(v)
+            weights.append(weight)
+        indptr.append(len(indices))
+    return indptr, indices, weights
+
+
+if __name__ == "__main__":
+    import random
+
+    # ~4-ISL grid mesh: planes x slots with intra- and cross-plane links
+    random.seed(1)
+    planes, slots = 24, 22
+    mesh = {}
+    for p in range(planes):
+        for s in range(slots):
+            node = p * slots + s
+            mesh[node] = [
+                (p * slots + (s + 1) % slots, random.randint(8, 12)),
+                (p * slots + (s - 1) % slots, random.randint(8, 12)),
+                (((p + 1) % planes) * slots + s, random.randint(10, 20)),
+                (((p - 1) % planes) * slots + s, random.randint(10, 20)),
+            ]
+
+    ch = ContractionHierarchy(mesh)
+    pairs = [(random.randrange(len(mesh)), random.randrange(len(mesh))) for _ in range(200)]
+    for start, end in pairs[:20]:
+        assert ch.query(start, end)[0] == dijkstra_with_path(mesh, start, end)[0]
+
+    report = ch.benchmark(mesh, pairs)
+    print(f"{len(mesh)} nodes: built in {report['build_seconds']:.2f}s, "
+          f"{report['shortcuts']} shortcuts, {report['index_bytes'] / 1024:.0f} KiB")
+    print(f"  CH query {report['ch_query_seconds'] * 1e6:.0f}us vs "
+          f"dijkstra_with_path {report['dijkstra_query_seconds'] * 1e6:.0f}us "
+          f"({report['speedup']:.1f}x), pays off after "
+          f"{report['break_even_queries']:.0f} queries")
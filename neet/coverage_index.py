@@ -0,0 +1,208 @@
+"""
+COVERAGE INDEX - Prebuilt merged windows for repeated queries
+=============================================================
+
+find_coverage_gaps() and has_continuous_coverage() re-merge and re-sort the
+whole window list on every call. CoverageIndex merges once (O(n log n)) into
+two sorted arrays of disjoint, maximal periods plus a prefix sum of covered
+time, then answers each query with a binary search:
+
+    covered_at(t)             O(log n)
+    next_coverage(t)          O(log n)
+    is_continuous(t0, t1)     O(log n)    - one merged period must span it
+    covered_time(t0, t1)      O(log n)
+    gaps(t0, t1)              O(log n + k) for k gaps
+
+Windows are closed [start, end], and windows that touch are one period,
+matching merge_intervals(). Gaps are clipped to the requested [t0, t1].
+
+The *_many variants take arrays of query times and answer them all with
+one np.searchsorted and a few whole-array operations, returning NumPy
+arrays. NumPy is imported on their first call only; the scalar queries
+stay pure Python.
+
+USE CASE: Thousands of "is this cell covered between t0 and t1?" queries
+against one visibility set
+"""
+
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Iterable, List, Optional, Tuple
+
+from note import merge_intervals
+
+
+class CoverageIndex:
+    """
+    Sorted, merged coverage periods with O(log n) lookups.
+
+    Args:
+        intervals: (start, end) visibility windows in any order. The input
+                   is not modified.
+    """
+
+    __slots__ = ('starts', 'ends', '_covered_before', '_arrays')
+
+    def __init__(self, intervals: Iterable[Tuple[float, float]]):
+        merged = merge_intervals(list(intervals))
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+        # _covered_before[i] = total covered time of periods 0 .. i-1
+        self._covered_before = list(accumulate((end - start for start, end in merged),
+                                               initial=0))
+        self._arrays = None  # NumPy columns for the *_many queries
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def periods(self) -> List[Tuple[float, float]]:
+        """The merged coverage periods, as merge_intervals() returns them."""
+        return list(zip(self.starts, self.ends))
+
+    def _period_at(self, t: float) -> int:
+        """Index of the last period starting at or before t (-1 if none)."""
+        return bisect_right(self.starts, t) - 1
+
+    # ------------------------------------------------------------------
+    # Point queries
+    # ------------------------------------------------------------------
+
+    def covered_at(self, t: float) -> bool:
+        i = self._period_at(t)
+        return i >= 0 and t <= self.ends[i]
+
+    def next_coverage(self, t: float) -> Optional[float]:
+        """Earliest covered time >= t, or None if coverage never resumes."""
+        i = self._period_at(t)
+        if i >= 0 and t <= self.ends[i]:
+            return t
+        if i + 1 < len(self.starts):
+            return self.starts[i + 1]
+        return None
+
+    # ------------------------------------------------------------------
+    # Range queries
+    # ------------------------------------------------------------------
+
+    def is_continuous(self, start_time: float, end_time: float) -> bool:
+        """Same question as has_continuous_coverage(intervals, start_time, end_time)."""
+        if end_time <= start_time:
+            return True  # Empty range: nothing to cover, as gaps() agrees
+        i = self._period_at(start_time)
+        return i >= 0 and self.ends[i] >= end_time
+
+    def gaps(self, required_start: float, required_end: float) -> List[Tuple[float, float]]:
+        """
+        Uncovered stretches of [required_start, required_end], like
+        find_coverage_gaps() but clipped to the requested window.
+        """
+        starts, ends = self.starts, self.ends
+        gaps = []
+        position = required_start
+        # First period that could still matter: ends at or after the start
+        i = bisect_left(ends, required_start)
+        while i < len(starts) and starts[i] <= required_end:
+            if starts[i] > position:
+                gaps.append((position, starts[i]))
+            position = max(position, ends[i])
+            i += 1
+        if position < required_end:
+            gaps.append((position, required_end))
+        return gaps
+
+    def covered_time(self, start_time: float, end_time: float) -> float:
+        """Total covered time within [start_time, end_time]."""
+        if end_time <= start_time:
+            return 0
+        return self._covered_until(end_time) - self._covered_until(start_time)
+
+    def _covered_until(self, t: float) -> float:
+        i = self._period_at(t)
+        if i < 0:
+            return 0
+        return self._covered_before[i] + min(t, self.ends[i]) - self.starts[i]
+
+    # ------------------------------------------------------------------
+    # Batched queries: one np.searchsorted over the whole query array
+    # ------------------------------------------------------------------
+
+    def _columns(self):
+        """NumPy copies of starts / ends / _covered_before, built on first use."""
+        if self._arrays is None:
+            import numpy as np
+            self._arrays = (np.asarray(self.starts), np.asarray(self.ends),
+                            np.asarray(self._covered_before))
+        return self._arrays
+
+    def _periods_at(self, times):
+        """
+        _period_at(t) for every t, clamped to 0 so it can index, plus a
+        mask of the times at or after the first period's start.
+        """
+        import numpy as np
+        starts, _, _ = self._columns()
+        i = np.searchsorted(starts, times, side='right') - 1
+        return np.maximum(i, 0), i >= 0
+
+    def covered_at_many(self, times):
+        """covered_at() for every t in an array; bool array."""
+        import numpy as np
+        times = np.asarray(times)
+        if not self.starts:
+            return np.zeros(times.shape, dtype=bool)
+        _, ends, _ = self._columns()
+        i, started = self._periods_at(times)
+        return started & (times <= ends[i])
+
+    def next_coverage_many(self, times):
+        """next_coverage() for every t in an array; NaN where it returns None."""
+        import numpy as np
+        times = np.asarray(times, dtype=float)
+        if not self.starts:
+            return np.full(times.shape, np.nan)
+        starts, ends, _ = self._columns()
+        i, started = self._periods_at(times)
+        inside = started & (times <= ends[i])
+        following = np.where(started, i + 1, 0)
+        upcoming = starts[np.minimum(following, starts.size - 1)].astype(float)
+        result = np.where(following < starts.size, upcoming, np.nan)
+        return np.where(inside, times, result)
+
+    def is_continuous_many(self, start_times, end_times):
+        """is_continuous() for every (t0, t1) pair of two arrays; bool array."""
+        import numpy as np
+        start_times, end_times = np.asarray(start_times), np.asarray(end_times)
+        empty = end_times <= start_times
+        if not self.starts:
+            return empty
+        _, ends, _ = self._columns()
+        i, started = self._periods_at(start_times)
+        return empty | (started & (ends[i] >= end_times))
+
+    def covered_time_many(self, start_times, end_times):
+        """covered_time() for every (t0, t1) pair of two arrays."""
+        import numpy as np
+        start_times, end_times = np.asarray(start_times), np.asarray(end_times)
+        if not self.starts:
+            return np.zeros(np.broadcast(start_times, end_times).shape)
+        covered = self._covered_until_many(end_times) - self._covered_until_many(start_times)
+        return np.where(end_times > start_times, covered, 0)
+
+    def _covered_until_many(self, times):
+        import numpy as np
+        starts, ends, covered_before = self._columns()
+        i, started = self._periods_at(times)
+        return np.where(started, covered_before[i] + np.minimum(times, ends[i]) - starts[i], 0)
+
+if __name__ == "__main__":
+    visibility_windows = [(0, 300), (240, 420), (400, 600), (700, 900)]
+    index = CoverageIndex(visibility_windows)
+
+    print(f"Merged periods: {index.periods()}")
+    print(f"Gaps 0-900s: {index.gaps(0, 900)}")
+    print(f"Continuous 0-600s: {index.is_continuous(0, 600)}, "
+          f"0-900s: {index.is_continuous(0, 900)}")
+    print(f"Covered at 650s: {index.covered_at(650)}, "
+          f"next coverage after 650s: {index.next_coverage(650)}")
+    print(f"Covered time 0-900s: {index.covered_time(0, 900)}s")
+    print(f"Batch covered_at: {index.covered_at_many([0, 610, 800, 1000])}")
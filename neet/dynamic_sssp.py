@@ -0,0 +1,267 @@
+"""
+INCREMENTAL SHORTEST-PATH MAINTENANCE
+=====================================
+
+Keeps a single-source shortest-path tree up to date while ISL weights drift
+and links come and go, repairing only the part of the tree an update can
+affect instead of rerunning dijkstra() from scratch.
+
+    Weight decrease / insertion:  if the edge now gives its head a shorter
+                                  distance, run Dijkstra outward from that
+                                  head only (nodes that don't improve stop
+                                  the wave).
+    Weight increase / deletion:   if the edge is NOT in the tree, nothing
+                                  changes. If it is, only the subtree below
+                                  it can get longer - detach that subtree,
+                                  seed each node from its best incoming edge
+                                  outside the subtree, and re-settle it.
+
+This is the classic dynamic SSSP repair (Ramalingam-Reps); the work per
+update is proportional to the nodes whose distance actually changes plus
+their incident edges.
+
+USE CASE: Track routes from a gateway while satellites move every few seconds
+"""
+
+import heapq
+from collections import defaultdict
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+from note import INF, CSRGraph, dijkstra
+
+
+class DynamicShortestPaths:
+    """
+    Shortest-path tree from one source over a mutable directed graph.
+
+    Args:
+        graph: adjacency dict {node: [(neighbor, weight), ...]} or CSRGraph.
+               The object keeps its own copy; parallel edges keep the
+               lowest weight.
+        source: root of the tree
+        distances: result of dijkstra(graph, source) to seed from;
+                   computed here if omitted
+
+    Undirected ISLs are two directed edges - update both directions.
+    """
+
+    def __init__(self, graph, source: Hashable,
+                 distances: Optional[Dict[Hashable, float]] = None):
+        if isinstance(graph, CSRGraph):
+            graph = graph.to_adjacency()
+
+        self.source = source
+        self._out = defaultdict(dict)   # u -> {v: weight}
+        self._in = defaultdict(dict)    # v -> {u: weight}
+        for u, neighbors in graph.items():
+            for v, weight in neighbors:
+                if weight < self._out[u].get(v, INF):
+                    self._out[u][v] = weight
+                    self._in[v][u] = weight
+
+        if distances is None:
+            distances = dijkstra(graph, source)
+        self._dist = dict(distances)
+        self._dist[source] = 0
+        self._pred = {}
+        self._children = defaultdict(set)
+
+        # Recover the tree from the distances by growing it outward from the
+        # source along tight edges (dist[u] + w == dist[v]). A node only ever
+        # gets a parent that is already attached, so zero-weight edges
+        # between equally distant nodes cannot form a predecessor cycle.
+        dist = self._dist
+        attached = {source}
+        frontier = [source]
+        while frontier:
+            u = frontier.pop()
+            for v, weight in self._out[u].items():
+                if v not in attached and v in dist and dist[u] + weight == dist[v]:
+                    attached.add(v)
+                    self._set_parent(v, u)
+                    frontier.append(v)
+        if len(attached) != len(dist):
+            v = next(v for v in dist if v not in attached)
+            raise ValueError(f"distances are not consistent with graph at {v!r}")
+
+    # ------------------------------------------------------------------
+    # Queries - same shapes as dijkstra / dijkstra_with_path
+    # ------------------------------------------------------------------
+
+    def distance(self, node: Hashable) -> float:
+        return self._dist.get(node, float('inf'))
+
+    def distances(self) -> Dict[Hashable, float]:
+        """{node: distance} for every reachable node, like dijkstra()."""
+        return dict(self._dist)
+
+    def path(self, end: Hashable) -> Tuple[float, List[Hashable]]:
+        """(distance, path) from source to end, like dijkstra_with_path()."""
+        if end not in self._dist:
+            return (float('inf'), [])
+        path = [end]
+        while path[-1] != self.source:
+            path.append(self._pred[path[-1]])
+        path.reverse()
+        return (self._dist[end], path)
+
+    def parent(self, node: Hashable) -> Optional[Hashable]:
+        """Predecessor of node in the current tree (None for source/unreached)."""
+        return self._pred.get(node)
+
+    def tree_edges(self) -> Set[Tuple[Hashable, Hashable]]:
+        return {(u, v) for v, u in self._pred.items()}
+
+    # ------------------------------------------------------------------
+    # Updates - each returns the set of nodes whose distance changed
+    # ------------------------------------------------------------------
+
+    def update_edge(self, u: Hashable, v: Hashable, weight: float) -> Set[Hashable]:
+        """
+        Set the weight of edge u -> v, inserting it if it doesn't exist.
+
+        Time Complexity: O(K log K) where K = nodes (and their edges) whose
+        distance changes - not the whole graph
+        """
+        if weight < 0:
+            raise ValueError("edge weights must be non-negative")
+        old = self._out[u].get(v)
+        self._out[u][v] = weight
+        self._in[v][u] = weight
+
+        if old is not None and weight > old:
+            return self._edge_got_worse(u, v)
+        return self._edge_got_better(u, v, weight)
+
+    def insert_edge(self, u: Hashable, v: Hashable, weight: float) -> Set[Hashable]:
+        """Add a new link u -> v (same as update_edge)."""
+        return self.update_edge(u, v, weight)
+
+    def delete_edge(self, u: Hashable, v: Hashable) -> Set[Hashable]:
+        """Remove link u -> v. Raises KeyError if it doesn't exist."""
+        del self._out[u][v]
+        del self._in[v][u]
+        return self._edge_got_worse(u, v)
+
+    # ------------------------------------------------------------------
+    # Repair
+    # ------------------------------------------------------------------
+
+    def _set_parent(self, v, u) -> None:
+        old = self._pred.get(v)
+        if old is not None:
+            self._children[old].discard(v)
+        self._pred[v] = u
+        self._children[u].add(v)
+
+    def _best_parent(self, v, excluded=()):
+        """In-neighbor giving v its shortest distance, ignoring `excluded`."""
+        parent, best = None, INF
+        dist = self._dist
+        for u, weight in self._in[v].items():
+            if u in excluded or u not in dist:
+                continue
+            candidate = dist[u] + weight
+            if candidate < best:
+                parent, best = u, candidate
+        return parent, best
+
+    def _propagate(self, heap, changed: Set) -> None:
+        """Dijkstra from the seeded heap, stopping where nothing improves."""
+        dist = self._dist
+        out = self._out
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist.get(u, INF):
+                continue
+            for v, weight in out[u].items():
+                candidate = d + weight
+                if candidate < dist.get(v, INF):
+                    dist[v] = candidate
+                    self._set_parent(v, u)
+                    changed.add(v)
+                    heapq.heappush(heap, (candidate, v))
+
+    def _edge_got_better(self, u, v, weight) -> Set[Hashable]:
+        changed = set()
+        if u in self._dist and self._dist[u] + weight < self._dist.get(v, INF):
+            self._dist[v] = self._dist[u] + weight
+            self._set_parent(v, u)
+            changed.add(v)
+            self._propagate([(self._dist[v], v)], changed)
+        return changed
+
+    def _edge_got_worse(self, u, v) -> Set[Hashable]:
+        if self._pred.get(v) != u:
+            return set()  # Not a tree edge - no distance depends on it
+
+        # Cheap case: v has another parent at the same distance (strictly
+        # closer to the source, so it can't be one of v's own descendants)
+        parent, best = self._best_parent(v)
+        if parent is not None and best == self._dist[v] and self._dist[parent] < best:
+            self._set_parent(v, parent)
+            return set()
+
+        # Collect the subtree hanging below v
+        affected = []
+        stack = [v]
+        while stack:
+            x = stack.pop()
+            affected.append(x)
+            stack.extend(self._children[x])
+        affected_set = set(affected)
+
+        old = {x: self._dist.pop(x) for x in affected}
+        for x in affected:
+            p = self._pred.pop(x)
+            self._children[p].discard(x)
+
+        # Seed every detached node from its best edge into the intact tree
+        heap = []
+        for x in affected:
+            parent, best = self._best_parent(x, affected_set)
+            if parent is not None:
+                self._dist[x] = best
+                self._set_parent(x, parent)
+                heap.append((best, x))
+        heapq.heapify(heap)
+
+        self._propagate(heap, set())
+        return {x for x in affected if self._dist.get(x, INF) != old[x]}
+
+
+if __name__ == "__main__":
+    from note import dijkstra_with_path
+
+    satellite_mesh = {
+        1: [(2, 10), (3, 15)],
+        2: [(1, 10), (4, 20), (5, 8)],
+        3: [(1, 15), (5, 12)],
+        4: [(2, 20), (6, 5)],
+        5: [(2, 8), (3, 12), (6, 10)],
+        6: [(4, 5), (5, 10)]
+    }
+
+    routes = DynamicShortestPaths(satellite_mesh, 1, dijkstra(satellite_mesh, 1))
+    print(f"Initial route 1 -> 6: {routes.path(6)}")
+
+    # ISL 2-5 degrades, then fails
+    changed = routes.update_edge(2, 5, 30)
+    print(f"2->5 now 30ms, repaired {sorted(changed)}: {routes.path(6)}")
+    changed = routes.delete_edge(2, 5)
+    print(f"2->5 down, repaired {sorted(changed)}: {routes.path(6)}")
+
+    # New cross-plane link comes up
+    changed = routes.insert_edge(3, 6, 4)
+    print(f"3->6 up at 4ms, repaired {sorted(changed)}: {routes.path(6)}")
+
+    # Regression: zero-weight links between equally distant nodes must not
+    # make them each other's parent (path() would loop forever)
+    tied = {'b': [('a', 0)], 'a': [('b', 0)], 'gw': [('a', 1), ('b', 1)]}
+    routes = DynamicShortestPaths(tied, 'gw')
+    assert routes.path('a') == (1, ['gw', 'a']) and routes.path('b') == (1, ['gw', 'b'])
+    routes.delete_edge('gw', 'a')
+    assert routes.path('a') == (1, ['gw', 'b', 'a'])
+    routes.update_edge('gw', 'a', 1)
+    routes.update_edge('gw', 'b', 5)
+    assert routes.path('b') == (1, ['gw', 'a', 'b'])
@@ -0,0 +1,73 @@
+"""
+HISTOGRAM - Fixed-bucket latency / size histograms
+==================================================
+
+Shared by the query service's request metrics and the instrumentation
+sinks, so neither has to import the other. Log-scale buckets make
+record() one bisect, cheap enough for every request or call.
+
+USE CASE: p50 / p99 of latencies and counters without keeping samples
+"""
+
+import math
+from bisect import bisect_left
+from typing import Dict, Sequence
+
+from note import INF
+
+
+class Histogram:
+    """
+    Fixed log-scale buckets: bounds[i] is the upper edge of bucket i, the
+    last bucket is unbounded. Cheap enough to record on every request.
+    """
+
+    __slots__ = ('bounds', 'counts', 'count', 'total', 'maximum')
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    @classmethod
+    def exponential(cls, first: float, factor: float, buckets: int) -> 'Histogram':
+        return cls([first * factor ** i for i in range(buckets)])
+
+    def record(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.maximum:
+            self.maximum = value
+
+    def percentile(self, p: float) -> float:
+        """Upper bucket edge at or above the p-th percentile (0 < p <= 100)."""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * p / 100)
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return self.bounds[i] if i < len(self.bounds) else self.maximum
+        return self.maximum
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def snapshot(self) -> Dict:
+        return {'count': self.count, 'mean': self.mean, 'max': self.maximum,
+                'p50': self.percentile(50), 'p99': self.percentile(99),
+                'buckets': list(zip(self.bounds + [INF], self.counts))}
+
+
+if __name__ == "__main__":
+    h = Histogram.exponential(1, 2, 10)
+    for value in range(1, 101):
+        h.record(value)
+    assert h.count == 100 and h.maximum == 100 and h.mean == 50.5
+    assert h.percentile(50) == 64 and h.percentile(100) == 128
+    print(h.snapshot())
@@ -0,0 +1,162 @@
+"""
+VECTORIZED INTERVAL KERNELS (NumPy)
+===================================
+
+Array-in / array-out versions of merge_intervals() and
+max_concurrent_satellites() for bulk window sets. Windows come in as two
+parallel arrays (starts, ends) instead of a list of tuples, and the inputs
+are never modified (merge_intervals() sorts the caller's list in place).
+
+merge_intervals_array:
+    argsort by start, running maximum of ends (np.maximum.accumulate), and
+    a new period begins wherever a start exceeds the running max of all
+    previous ends. One sort plus three linear passes, all in C.
+
+concurrency_profile:
+    +1 / -1 events sorted with starts before ends at equal times (touching
+    windows count as overlapping, like max_concurrent_satellites), cumulative
+    sum = occupancy after each event. Returns the full step function, not
+    just the peak.
+
+USE CASE: Millions of visibility windows per day through the coverage
+pipeline
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+def _as_arrays(starts, ends) -> Tuple[np.ndarray, np.ndarray]:
+    starts = np.asarray(starts)
+    ends = np.asarray(ends)
+    if starts.shape != ends.shape or starts.ndim != 1:
+        raise ValueError("starts and ends must be 1-D arrays of equal length")
+    return starts, ends
+
+
+def merge_intervals_array(starts, ends) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge overlapping or touching windows.
+
+    Args:
+        starts, ends: 1-D arrays (or sequences) of window bounds
+
+    Returns:
+        (merged_starts, merged_ends) sorted, disjoint periods - the same
+        periods merge_intervals() returns, as two arrays
+
+    Time Complexity: O(n log n) - one argsort, the rest is linear
+    """
+    starts, ends = _as_arrays(starts, ends)
+    if starts.size == 0:
+        return starts.copy(), ends.copy()
+
+    order = np.argsort(starts, kind='stable')
+    s = starts[order]
+    reach = np.maximum.accumulate(ends[order])
+
+    # Period boundary where a window starts after everything before it ended
+    new_period = np.empty(s.size, dtype=bool)
+    new_period[0] = True
+    np.greater(s[1:], reach[:-1], out=new_period[1:])
+
+    first = np.flatnonzero(new_period)
+    last = np.append(first[1:] - 1, s.size - 1)
+    return s[first], reach[last]
+
+
+def merge_intervals_pairs(intervals) -> np.ndarray:
+    """
+    Same as merge_intervals_array but takes/returns an (n, 2) array, for
+    callers that already hold windows as rows.
+    """
+    intervals = np.asarray(intervals)
+    if intervals.size == 0:
+        return intervals.reshape(0, 2)
+    merged_starts, merged_ends = merge_intervals_array(intervals[:, 0], intervals[:, 1])
+    return np.column_stack((merged_starts, merged_ends))
+
+
+def _event_sweep(starts, ends):
+    """Sorted event times and the running count after each event."""
+    starts, ends = _as_arrays(starts, ends)
+    times = np.concatenate((starts, ends))
+    deltas = np.concatenate((np.ones(starts.size, dtype=np.int64),
+                             np.full(ends.size, -1, dtype=np.int64)))
+    # Sort by time, starts (+1) before ends (-1) at equal times
+    order = np.lexsort((-deltas, times))
+    return times[order], np.cumsum(deltas[order])
+
+
+def _collapse(times, counts):
+    """Keep the state after the last of several simultaneous events."""
+    if times.size == 0:
+        return times, counts
+    last_at_time = np.append(times[1:] != times[:-1], True)
+    return times[last_at_time], counts[last_at_time]
+
+
+def concurrency_profile(starts, ends) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Step function of how many windows are open over time.
+
+    Returns:
+        (times, counts): counts[i] satellites are visible from times[i]
+        until times[i + 1]; the last entry is always 0. One entry per
+        distinct event time.
+
+    At an instant where one window ends exactly as another starts, both
+    count as visible (see max_concurrent_array); the step function reports
+    the level on either side of that instant.
+
+    Time Complexity: O(n log n)
+    """
+    return _collapse(*_event_sweep(starts, ends))
+
+
+def max_concurrent_array(starts, ends, return_profile: bool = False):
+    """
+    Peak number of simultaneously visible windows - the vectorized
+    max_concurrent_satellites(). Touching windows count as overlapping.
+
+    Args:
+        return_profile: also return the concurrency_profile() step function
+
+    Returns:
+        peak, or (peak, times, counts) with return_profile=True
+    """
+    times, counts = _event_sweep(starts, ends)
+    peak = int(counts.max()) if counts.size else 0
+    if not return_profile:
+        return peak
+    return (peak,) + _collapse(times, counts)
+
+
+if __name__ == "__main__":
+    import time
+
+    from note import max_concurrent_satellites, merge_intervals
+
+    rng = np.random.default_rng(0)
+    n = 1_000_000
+    starts = rng.uniform(0, n * 300.0, n)
+    ends = starts + rng.uniform(60, 600, n)
+    windows = list(zip(starts.tolist(), ends.tolist()))
+
+    t0 = time.perf_counter()
+    merged_starts, merged_ends = merge_intervals_array(starts, ends)
+    t1 = time.perf_counter()
+    reference = merge_intervals(list(windows))
+    t2 = time.perf_counter()
+    assert reference == list(zip(merged_starts.tolist(), merged_ends.tolist()))
+    print(f"merge {n} windows: {t1 - t0:.3f}s vectorized vs {t2 - t1:.3f}s loop "
+          f"-> {merged_starts.size} periods")
+
+    t0 = time.perf_counter()
+    peak, times, counts = max_concurrent_array(starts, ends, return_profile=True)
+    t1 = time.perf_counter()
+    assert peak == max_concurrent_satellites(windows)
+    t2 = time.perf_counter()
+    print(f"concurrency profile: {t1 - t0:.3f}s vectorized vs {t2 - t1:.3f}s loop "
+          f"-> peak {peak}, {times.size} steps")
@@ -24,6 +24,9 @@ def dijkstra(graph, start):
 from collections import deque
 
 def bfs(graph, start):
+    if isinstance(graph, CSRGraph):
+        return _bfs_csr(graph, start)
+
     visited = set()
     queue = deque([start])
     visited.add(start)
@@ -40,6 +43,28 @@ def bfs(graph, start):
     return visited
 
 
+def _bfs_csr(graph, start):
+    # Same walk over the flat CSR arrays with a bytearray visited buffer
+    if start not in graph.node_index:
+        return {start}
+    indptr, indices = graph.indptr, graph.indices
+    seen = bytearray(graph.num_nodes)
+    source = graph.node_index[start]
+    seen[source] = 1
+    queue = deque([source])
+
+    while queue:
+        node = queue.popleft()
+        for e in range(indptr[node], indptr[node + 1]):
+            neighbor = indices[e]
+            if not seen[neighbor]:
+                seen[neighbor] = 1
+                queue.append(neighbor)
+
+    ids = graph.node_ids
+    return {ids[i] for i in range(graph.num_nodes) if seen[i]}
+
+
 
 
 def merge_intervals(intervals):
@@ -74,16 +99,243 @@ These are the most critical algorithms for constellation problems:
 Author: SpaceX Interview Prep
 """
 
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Hashable, Iterable, Sequence
 import heapq
+import math
+from array import array
 from collections import defaultdict
 
 
+INF = float('inf')
+
+# Instrumentation hook, installed by instrument.enable(). While it is None
+# every instrumented function pays one global lookup per call and runs
+# heapq's own functions; when set, _probe(name) returns a Call (or None if
+# that function is filtered out) that counts heap operations and collects
+# per-call counters and timing.
+_probe = None
+
+
+def _heap_ops(call):
+    """(heappush, heappop) for one call: heapq's, or the Call's counting ones."""
+    if call is None:
+        return heapq.heappush, heapq.heappop
+    return call.heappush, call.heappop
+
+
+# ============================================================================
+# 0. COMPACT CSR GRAPH - Array-backed mesh storage
+# ============================================================================
+
+class CSRGraph:
+    """
+    Compressed Sparse Row (CSR) graph with dense integer node IDs.
+
+    The mesh is held in three contiguous arrays instead of a dict of lists
+    of tuples:
+
+        indptr[i] .. indptr[i + 1]   slice of edges leaving dense node i
+        indices[e]                   dense target node of edge e
+        weights[e]                   weight (latency) of edge e
+
+    node_ids maps dense index -> original node ID, node_index is the
+    reverse mapping. All algorithms work on dense indices internally and
+    only translate back to original IDs at the boundary.
+
+    Memory: ~16 bytes per edge (int32 target + int64/float64 weight) versus
+    a few hundred bytes per edge for Dict[int, List[Tuple[int, int]]].
+
+    USE CASE: Hold a full-constellation ISL mesh (tens of thousands of
+    satellites) in a cache-friendly layout that can also be shared between
+    processes as raw buffers.
+    """
+
+    __slots__ = ('indptr', 'indices', 'weights', 'node_ids', 'node_index')
+
+    def __init__(self, indptr: Sequence[int], indices: Sequence[int],
+                 weights: Sequence[float],
+                 node_ids: Optional[Sequence[Hashable]] = None):
+        num_nodes = len(indptr) - 1
+        if num_nodes < 0:
+            raise ValueError("indptr must have at least one entry")
+        if len(indices) != len(weights) or indptr[-1] != len(indices):
+            raise ValueError("indptr, indices and weights are inconsistent")
+
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.node_ids = list(node_ids) if node_ids is not None else list(range(num_nodes))
+        if len(self.node_ids) != num_nodes:
+            raise ValueError("node_ids must have one entry per node")
+        self.node_index = {node: i for i, node in enumerate(self.node_ids)}
+
+    @classmethod
+    def from_adjacency(cls, graph: Dict) -> 'CSRGraph':
+        """
+        Build a CSR graph from an adjacency dict.
+
+        Accepts both weighted {node: [(neighbor, weight), ...]} and
+        unweighted {node: [neighbor, ...]} (weight 1) lists. Nodes that only
+        appear as neighbors get a dense ID with no outgoing edges.
+
+        Time Complexity: O(V + E)
+        """
+        node_index = {}
+        node_ids = []
+        for node in graph:
+            node_index[node] = len(node_ids)
+            node_ids.append(node)
+
+        edges = []
+        integral = True
+        for node, neighbors in graph.items():
+            row = []
+            for entry in neighbors:
+                if isinstance(entry, tuple):
+                    neighbor, weight = entry
+                else:
+                    neighbor, weight = entry, 1
+                if neighbor not in node_index:
+                    node_index[neighbor] = len(node_ids)
+                    node_ids.append(neighbor)
+                if not isinstance(weight, int):
+                    integral = False
+                row.append((node_index[neighbor], weight))
+            edges.append(row)
+
+        indptr = array('q', [0])
+        indices = array('i')
+        weights = array('q' if integral else 'd')
+        for row in edges:
+            for neighbor, weight in row:
+                indices.append(neighbor)
+                weights.append(weight)
+            indptr.append(len(indices))
+        # Neighbor-only nodes have empty rows
+        for _ in range(len(node_ids) - len(edges)):
+            indptr.append(len(indices))
+
+        return cls(indptr, indices, weights, node_ids)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.indices)
+
+    @property
+    def integral(self) -> bool:
+        """True if weights are integers (distances are reported as ints)."""
+        weights = self.weights
+        code = getattr(weights, 'typecode', None) or getattr(weights, 'format', 'd')
+        return code in 'bBhHiIlLqQ'
+
+    def neighbors(self, i: int):
+        """Yield (dense_neighbor, weight) pairs for dense node i."""
+        weights = self.weights
+        indices = self.indices
+        for e in range(self.indptr[i], self.indptr[i + 1]):
+            yield indices[e], weights[e]
+
+    def to_adjacency(self) -> Dict[Hashable, List[Tuple[Hashable, float]]]:
+        """Convert back to the {node: [(neighbor, weight), ...]} form."""
+        ids = self.node_ids
+        return {ids[i]: [(ids[v], w) for v, w in self.neighbors(i)]
+                for i in range(self.num_nodes)}
+
+    def nbytes(self) -> int:
+        """Bytes held by the three CSR arrays."""
+        return sum(len(a) * getattr(a, 'itemsize', 8)
+                   for a in (self.indptr, self.indices, self.weights))
+
+
+def to_csr(graph) -> CSRGraph:
+    """
+    One-time converter: returns graph unchanged if it is already a CSRGraph,
+    otherwise builds one from the adjacency dict.
+    """
+    if isinstance(graph, CSRGraph):
+        return graph
+    return CSRGraph.from_adjacency(graph)
+
+
+def _sssp(indptr, indices, weights, source: int, target: int = -1, call=None):
+    """
+    Array-backed Dijkstra kernel on raw CSR buffers (dense IDs only).
+
+    Works on anything indexable - array.array, memoryview over shared
+    memory, lists - so the same kernel serves every backend.
+
+    The scratch buffers are flat lists indexed by dense ID rather than
+    dicts: no hashing, no defaultdict, and (unlike array.array) reads in
+    the inner loop don't allocate a new boxed number each time.
+
+    call: instrument.Call to count into (None: plain heapq, no counting)
+
+    Returns:
+        (dist, pred, order)
+        dist:  distances indexed by dense ID, INF if unreached
+        pred:  predecessor dense IDs, -1 for source/unreached
+        order: dense IDs in the order they were settled
+    """
+    n = len(indptr) - 1
+    dist = [INF] * n
+    pred = [-1] * n
+    settled = bytearray(n)
+    order = []
+
+    dist[source] = 0
+    priority_queue = [(0, source)]
+    heappush, heappop = _heap_ops(call)
+
+    while priority_queue:
+        current_distance, u = heappop(priority_queue)
+        if settled[u]:
+            continue
+        settled[u] = 1
+        order.append(u)
+
+        if u == target:
+            break
+
+        lo, hi = indptr[u], indptr[u + 1]
+        for v, weight in zip(indices[lo:hi], weights[lo:hi]):
+            distance = current_distance + weight
+            if distance < dist[v]:
+                dist[v] = distance
+                pred[v] = u
+                heappush(priority_queue, (distance, v))
+
+    if call is not None:
+        # The target (if reached) is settled but never expanded
+        expanded = order[:-1] if order and order[-1] == target else order
+        call.add(settled=len(order), stale=call.pops - len(order),
+                 relaxations=call.pushes,
+                 edges=sum(indptr[u + 1] - indptr[u] for u in expanded))
+    return dist, pred, order
+
+
+def _csr_path(csr: CSRGraph, pred, target: int) -> List[Hashable]:
+    """Walk the predecessor buffer back from target and map to node IDs."""
+    ids = csr.node_ids
+    path = []
+    current = target
+    while current != -1:
+        path.append(ids[current])
+        current = pred[current]
+    path.reverse()
+    return path
+
+
 # ============================================================================
 # 1. DIJKSTRA'S ALGORITHM - Shortest Path in Weighted Graph
 # ============================================================================
 
-def dijkstra(graph: Dict[int, List[Tuple[int, int]]], start: int) -> Dict[int, int]:
+def dijkstra(graph: Dict[int, List[Tuple[int, int]]], start: int,
+             cutoff: Optional[float] = None, targets: Optional[Iterable] = None,
+             k: Optional[int] = None) -> Dict[int, int]:
     """
     Find shortest path from start node to all other nodes.
     
@@ -91,9 +343,17 @@ def dijkstra(graph: Dict[int, List[Tuple[int, int]]], start: int) -> Dict[int, i
         graph: adjacency list {node: [(neighbor, weight), ...]}
                Example: {1: [(2, 10), (3, 5)], 2: [(4, 1)], ...}
         start: starting node
+        cutoff: stop once the next node is farther than this; only nodes
+                within cutoff are returned
+        targets: stop once every target is settled; only targets are
+                 returned
+        k: stop once k targets (k nodes if no targets are given) are
+           settled
     
     Returns:
-        Dictionary of {node: shortest_distance_from_start}
+        Dictionary of {node: shortest_distance_from_start}. With any of
+        cutoff / targets / k, only what the search settled (see
+        _bounded_search) - nothing beyond the bound is explored.
     
     Time Complexity: O((V + E) log V)
         - V vertices, E edges
@@ -103,7 +363,30 @@ def dijkstra(graph: Dict[int, List[Tuple[int, int]]], start: int) -> Dict[int, i
     Space Complexity: O(V)
     
     USE CASE: Find lowest-latency route through Starlink satellite mesh
+
+    A CSRGraph may be passed instead of the dict; the search then runs on
+    array-backed distance/predecessor buffers and maps back to node IDs.
     """
+    call = _probe('dijkstra') if _probe is not None else None
+
+    if cutoff is not None or targets is not None or k is not None:
+        settled, _ = _bounded_search(graph, start, cutoff, targets, k, call)
+        if call is not None:
+            call.finish()
+        return settled
+
+    if isinstance(graph, CSRGraph):
+        if start not in graph.node_index:
+            if call is not None:
+                call.finish()
+            return {start: 0}
+        dist, _, order = _sssp(graph.indptr, graph.indices, graph.weights,
+                               graph.node_index[start], call=call)
+        ids = graph.node_ids
+        if call is not None:
+            call.finish()
+        return {ids[i]: dist[i] for i in order}
+
     # Initialize distances to infinity
     distances = defaultdict(lambda: float('inf'))
     distances[start] = 0
@@ -111,12 +394,13 @@ def dijkstra(graph: Dict[int, List[Tuple[int, int]]], start: int) -> Dict[int, i
     # Min-heap: (distance, node)
     # Python's heapq is a min-heap by default
     priority_queue = [(0, start)]
+    heappush, heappop = _heap_ops(call)
     
     # Set to track processed nodes (optimization)
     visited = set()
     
     while priority_queue:
-        current_distance, current_node = heapq.heappop(priority_queue)
+        current_distance, current_node = heappop(priority_queue)
         
         # Skip if already processed (important optimization!)
         if current_node in visited:
@@ -131,8 +415,13 @@ def dijkstra(graph: Dict[int, List[Tuple[int, int]]], start: int) -> Dict[int, i
             # Only update if we found a shorter path
             if distance < distances[neighbor]:
                 distances[neighbor] = distance
-                heapq.heappush(priority_queue, (distance, neighbor))
+                heappush(priority_queue, (distance, neighbor))
     
+    if call is not None:
+        call.add(settled=len(visited), stale=call.pops - len(visited),
+                 relaxations=call.pushes,
+                 edges=sum(len(graph.get(u, ())) for u in visited))
+        call.finish()
     return dict(distances)
 
 
@@ -148,6 +437,23 @@ def dijkstra_with_path(graph: Dict[int, List[Tuple[int, int]]],
     
     USE CASE: Show actual route data takes through satellites
     """
+    call = _probe('dijkstra_with_path') if _probe is not None else None
+
+    if isinstance(graph, CSRGraph):
+        index = graph.node_index
+        if start not in index or end not in index:
+            if call is not None:
+                call.finish()
+            return (0, [start]) if start == end else (float('inf'), [])
+        target = index[end]
+        dist, pred, _ = _sssp(graph.indptr, graph.indices, graph.weights,
+                              index[start], target, call)
+        if call is not None:
+            call.finish()
+        if dist[target] == INF:
+            return (float('inf'), [])
+        return (dist[target], _csr_path(graph, pred, target))
+
     distances = defaultdict(lambda: float('inf'))
     distances[start] = 0
     
@@ -155,10 +461,11 @@ def dijkstra_with_path(graph: Dict[int, List[Tuple[int, int]]],
     previous = {}
     
     priority_queue = [(0, start)]
+    heappush, heappop = _heap_ops(call)
     visited = set()
     
     while priority_queue:
-        current_distance, current_node = heapq.heappop(priority_queue)
+        current_distance, current_node = heappop(priority_queue)
         
         if current_node in visited:
             continue
@@ -175,8 +482,14 @@ def dijkstra_with_path(graph: Dict[int, List[Tuple[int, int]]],
             if distance < distances[neighbor]:
                 distances[neighbor] = distance
                 previous[neighbor] = current_node
-                heapq.heappush(priority_queue, (distance, neighbor))
+                heappush(priority_queue, (distance, neighbor))
     
+    if call is not None:
+        call.add(settled=len(visited), stale=call.pops - len(visited),
+                 relaxations=call.pushes,
+                 edges=sum(len(graph.get(u, ())) for u in visited if u != end))
+        call.finish()
+
     # Reconstruct path
     if end not in previous and end != start:
         return (float('inf'), [])  # No path exists
@@ -192,6 +505,110 @@ def dijkstra_with_path(graph: Dict[int, List[Tuple[int, int]]],
     return (distances[end], path)
 
 
+def _bounded_search(graph, start, cutoff: Optional[float] = None,
+                    targets: Optional[Iterable] = None,
+                    k: Optional[int] = None, call=None) -> Tuple[Dict, Dict]:
+    """
+    Dijkstra that stops as soon as its question is answered:
+
+        cutoff    next node farther than cutoff (pushes beyond it are
+                  skipped too)
+        targets   every target settled
+        k         k targets settled (any k nodes if targets is None);
+                  k <= 0 settles nothing
+
+    Labels live in dicts sized by what the search touches, so a bounded
+    query never allocates or sweeps O(V) state - even on a CSRGraph.
+
+    Returns:
+        (settled, previous) with settled = {node: distance} in settle
+        order (only targets when targets are given) and previous =
+        {node: predecessor} for path reconstruction via _unwind
+    """
+    expand, translate, _ = _edges_of(graph)
+    ids = graph.node_ids if isinstance(graph, CSRGraph) else None
+    name = ids.__getitem__ if ids is not None else (lambda node: node)
+
+    if k is not None and k <= 0:
+        return {}, {}
+    # Materialize once: targets may be a one-shot iterator
+    targets = None if targets is None else set(targets)
+    wanted = None
+    if targets is not None:
+        wanted = {translate(t) for t in targets} - {None}
+        if not wanted and start not in targets:
+            return {}, {}
+    s = translate(start)
+    if s is None:
+        hit = targets is None or start in targets
+        return ({start: 0} if hit and (cutoff is None or cutoff >= 0) else {}), {}
+
+    labels = {s: 0}
+    previous = {}
+    settled = {}
+    found = 0
+    queue = [(0, s)]
+    heappush, heappop = _heap_ops(call)
+    while queue:
+        distance, u = heappop(queue)
+        if u in settled:
+            continue
+        if cutoff is not None and distance > cutoff:
+            break
+        settled[u] = distance
+
+        if wanted is None or u in wanted:
+            found += 1
+            if k is not None and found >= k:
+                break
+            if wanted is not None and found == len(wanted):
+                break
+
+        for v, weight in expand(u):
+            candidate = distance + weight
+            if cutoff is not None and candidate > cutoff:
+                continue
+            if candidate < labels.get(v, INF):
+                labels[v] = candidate
+                previous[v] = u
+                heappush(queue, (candidate, v))
+
+    if call is not None:
+        call.add(settled=len(settled), stale=call.pops - len(settled),
+                 relaxations=call.pushes, labeled=len(labels))
+    if wanted is not None:
+        settled = {u: d for u, d in settled.items() if u in wanted}
+    if ids is not None:
+        settled = {ids[u]: d for u, d in settled.items()}
+        previous = {ids[v]: ids[u] for v, u in previous.items()}
+    return settled, previous
+
+
+def nearest_targets(graph, start, targets: Iterable, k: int = 1,
+                    cutoff: Optional[float] = None) -> List[Tuple[Hashable, float, List]]:
+    """
+    The k targets closest to start, nearest first, with their paths.
+
+    Args:
+        targets: candidate nodes (e.g. ground-station gateways)
+        k: how many to return
+        cutoff: ignore targets farther than this
+
+    Returns:
+        [(target, distance, path), ...]; fewer than k if fewer are
+        reachable within cutoff
+
+    USE CASE: "Nearest of these 200 ground stations" - the search stops
+    as soon as the k-th one is settled
+    """
+    call = _probe('nearest_targets') if _probe is not None else None
+    settled, previous = _bounded_search(graph, start, cutoff, targets, k, call)
+    if call is not None:
+        call.finish()
+    return [(target, distance, _unwind(previous, target))
+            for target, distance in settled.items()]
+
+
 # ============================================================================
 # 2. INTERVAL MERGING - Coverage Window Analysis
 # ============================================================================
@@ -214,6 +631,7 @@ def merge_intervals(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
     """
     if not intervals:
         return []
+    call = _probe('merge_intervals') if _probe is not None else None
     
     # Sort by start time
     intervals.sort(key=lambda x: x[0])
@@ -230,6 +648,9 @@ def merge_intervals(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
             # No overlap, add as new interval
             merged.append((start, end))
     
+    if call is not None:
+        call.add(sort_size=len(intervals), merged=len(merged))
+        call.finish()
     return merged
 
 
@@ -252,6 +673,7 @@ def find_coverage_gaps(intervals: List[Tuple[int, int]],
     """
     if not intervals:
         return [(required_start, required_end)]
+    call = _probe('find_coverage_gaps') if _probe is not None else None
     
     # Merge overlapping intervals first
     merged = merge_intervals(intervals)
@@ -271,6 +693,9 @@ def find_coverage_gaps(intervals: List[Tuple[int, int]],
     if current_position < required_end:
         gaps.append((current_position, required_end))
     
+    if call is not None:
+        call.add(windows=len(intervals), merged=len(merged), gaps=len(gaps))
+        call.finish()
     return gaps
 
 
@@ -293,6 +718,137 @@ def has_continuous_coverage(intervals: List[Tuple[int, int]],
 # 3. GREEDY SCHEDULING - Handoff Optimization
 # ============================================================================
 
+def _sweep_handoffs(starts: Sequence, ends: Sequence, lo: int, hi: int,
+                    start_time=None, end_time=None, call=None,
+                    ties: Optional[Sequence] = None):
+    """
+    Core of handoff_plan() over rows lo .. hi-1 of start-sorted columns.
+
+    Yields (row, connect_time, disconnect_time) with row = -1 for a gap,
+    so batch callers can run it directly on columnar data. Candidates with
+    equal end times go to the lowest ties[row] (default: the lowest row).
+    With a call,
+    heap pushes are the candidates scanned and pops beyond the chosen
+    windows are the expired ones dropped.
+    """
+    if lo >= hi:
+        if start_time is not None and end_time is not None and start_time < end_time:
+            yield (-1, start_time, end_time)
+        return
+
+    current_time = starts[lo] if start_time is None else start_time
+    candidates = []  # Max-heap: (-end, tie, row)
+    heappush, heappop = _heap_ops(call)
+    i = lo
+
+    while end_time is None or current_time < end_time:
+        # Everything that has started by now becomes a candidate
+        while i < hi and starts[i] <= current_time:
+            heappush(candidates, (-ends[i], i if ties is None else ties[i], i))
+            i += 1
+
+        # Drop candidates that no longer extend coverage
+        while candidates and -candidates[0][0] <= current_time:
+            heappop(candidates)
+
+        if not candidates:
+            # Coverage gap until the next window (or the required end)
+            if i < hi:
+                gap_end = starts[i]
+            elif end_time is not None:
+                gap_end = end_time
+            else:
+                break
+            if end_time is not None:
+                gap_end = min(gap_end, end_time)
+            yield (-1, current_time, gap_end)
+            current_time = gap_end
+            continue
+
+        # Greedy choice: satellite that stays visible longest
+        neg_end, _, row = heappop(candidates)
+        disconnect_time = -neg_end
+        if end_time is not None:
+            disconnect_time = min(disconnect_time, end_time)
+        yield (row, current_time, disconnect_time)
+        current_time = disconnect_time
+
+
+def handoff_plan(intervals: List[Tuple[int, int, str]],
+                 start_time: Optional[int] = None,
+                 end_time: Optional[int] = None) -> List[Dict]:
+    """
+    Sweep-line handoff scheduler: satellite sequence, connect/disconnect
+    times and coverage gaps in one pass.
+
+    Windows are swept in start order. Every window that has started by the
+    current time goes onto a max-heap keyed by end time; windows that have
+    already ended are discarded lazily when they reach the top. The greedy
+    choice (stay with the satellite visible longest) is then a heap pop
+    instead of a rescan + re-sort of everything available.
+
+    Args:
+        intervals: List of (start, end, satellite_id). Not modified.
+        start_time: when coverage is needed from (default: earliest start)
+        end_time: when coverage is needed until (default: until the last
+                  window closes). Events are clipped to it.
+
+    Returns:
+        Events in time order, same format as optimal_handoff_schedule:
+        {'satellite', 'connect_time', 'disconnect_time', 'duration'} and
+        {'type': 'GAP', 'start', 'end', 'duration'}
+
+    Time Complexity: O(n log n) - one sort, each window pushed/popped once
+    Space Complexity: O(n)
+
+    USE CASE: Full day of windows for a busy terminal
+    """
+    return _handoff_plan(intervals, start_time, end_time, 'handoff_plan')
+
+
+def _handoff_plan(intervals, start_time, end_time, name: str,
+                  largest_id_first: bool = False) -> List[Dict]:
+    """
+    handoff_plan(), recorded under the public function's name. Equal end
+    times go to the earliest (start, end, id) window, or with
+    largest_id_first to the largest satellite ID.
+    """
+    call = _probe(name) if _probe is not None else None
+    windows = sorted(intervals)
+    starts = [w[0] for w in windows]
+    ends = [w[1] for w in windows]
+    ties = None
+    if largest_id_first:
+        ties = [0] * len(windows)
+        by_id = sorted(range(len(windows)), key=lambda row: windows[row][2], reverse=True)
+        for position, row in enumerate(by_id):
+            ties[row] = position
+
+    schedule = []
+    for row, connect_time, disconnect_time in _sweep_handoffs(
+            starts, ends, 0, len(windows), start_time, end_time, call, ties):
+        if row < 0:
+            schedule.append({
+                'type': 'GAP',
+                'start': connect_time,
+                'end': disconnect_time,
+                'duration': disconnect_time - connect_time
+            })
+        else:
+            schedule.append({
+                'satellite': windows[row][2],
+                'connect_time': connect_time,
+                'disconnect_time': disconnect_time,
+                'duration': disconnect_time - connect_time
+            })
+    if call is not None:
+        chosen = sum(1 for event in schedule if 'satellite' in event)
+        call.add(sort_size=len(windows), candidates=call.pushes,
+                 expired=call.pops - chosen, events=len(schedule))
+        call.finish()
+    return schedule
+
+
 def min_handoffs_schedule(intervals: List[Tuple[int, int, str]]) -> List[str]:
     """
     Minimize number of handoffs while maintaining continuous coverage.
@@ -310,42 +866,17 @@ def min_handoffs_schedule(intervals: List[Tuple[int, int, str]]) -> List[str]:
     Space Complexity: O(n)
     
     USE CASE: Minimize handoffs for smoother user experience
+
+    Coverage is required from the earliest window's start to the latest
+    window's end; see handoff_plan() for the sweep itself. Satellites that
+    stay visible equally long are broken by the largest satellite_id.
     """
-    if not intervals:
-        return []
-    
-    # Sort by start time
-    intervals.sort(key=lambda x: x[0])
-    
     schedule = []
-    current_end = 0
-    i = 0
-    
-    while i < len(intervals):
-        # Find all satellites available at current_end
-        available = []
-        
-        while i < len(intervals) and intervals[i][0] <= current_end:
-            start, end, sat_id = intervals[i]
-            if end > current_end:  # Only consider if extends coverage
-                available.append((end, sat_id))
-            i += 1
-        
-        if not available:
-            # No satellite available - coverage gap!
+    for event in _handoff_plan(intervals, None, None, 'min_handoffs_schedule',
+                               largest_id_first=True):
+        if event.get('type') == 'GAP':
             return []  # Cannot maintain continuous coverage
-        
-        # Greedy choice: pick satellite that ends latest
-        available.sort(reverse=True)  # Sort by end time descending
-        next_end, next_sat = available[0]
-        
-        schedule.append(next_sat)
-        current_end = next_end
-        
-        # Check if we've covered everything
-        if current_end >= max(interval[1] for interval in intervals):
-            break
-    
+        schedule.append(event['satellite'])
     return schedule
 
 
@@ -366,64 +897,15 @@ def optimal_handoff_schedule(satellites: List[Dict]) -> List[Dict]:
         ]
     
     USE CASE: Generate actual handoff schedule for constellation control
+
+    Coverage is tracked from t=0, so a first window starting later shows up
+    as a leading GAP.
     """
     if not satellites:
         return []
-    
-    # Convert to tuples for processing
+
     intervals = [(sat['start'], sat['end'], sat['id']) for sat in satellites]
-    intervals.sort()
-    
-    schedule = []
-    current_time = 0
-    i = 0
-    
-    while i < len(intervals):
-        # Find best satellite at current time
-        best_sat = None
-        best_end = current_time
-        
-        # Check all satellites that are available now
-        j = i
-        while j < len(intervals) and intervals[j][0] <= current_time:
-            start, end, sat_id = intervals[j]
-            if end > best_end:
-                best_end = end
-                best_sat = sat_id
-            j += 1
-        
-        if best_sat is None:
-            # Coverage gap - find next available satellite
-            if i < len(intervals):
-                # Jump to next satellite's start time
-                gap_start = current_time
-                gap_end = intervals[i][0]
-                schedule.append({
-                    'type': 'GAP',
-                    'start': gap_start,
-                    'end': gap_end,
-                    'duration': gap_end - gap_start
-                })
-                current_time = intervals[i][0]
-                continue
-            else:
-                break
-        
-        # Add this satellite to schedule
-        connect_time = current_time
-        disconnect_time = best_end
-        
-        schedule.append({
-            'satellite': best_sat,
-            'connect_time': connect_time,
-            'disconnect_time': disconnect_time,
-            'duration': disconnect_time - connect_time
-        })
-        
-        current_time = best_end
-        i = j
-    
-    return schedule
+    return _handoff_plan(intervals, 0, None, 'optimal_handoff_schedule')
 
 
 def max_concurrent_satellites(intervals: List[Tuple[int, int]]) -> int:
@@ -442,6 +924,7 @@ def max_concurrent_satellites(intervals: List[Tuple[int, int]]) -> int:
     """
     if not intervals:
         return 0
+    call = _probe('max_concurrent_satellites') if _probe is not None else None
     
     # Create events: +1 for start, -1 for end
     events = []
@@ -459,9 +942,246 @@ def max_concurrent_satellites(intervals: List[Tuple[int, int]]) -> int:
         current_count += delta
         max_concurrent = max(max_concurrent, current_count)
     
+    if call is not None:
+        call.add(sort_size=len(events), peak=max_concurrent)
+        call.finish()
     return max_concurrent
 
 
+# ============================================================================
+# 4. POINT-TO-POINT SEARCH - Bidirectional Dijkstra and A*
+# ============================================================================
+
+# Speed of light in km per millisecond (the unit of the example latencies).
+# Use 0.299792458 for integer-microsecond weights.
+C_KM_PER_MS = 299.792458
+EARTH_RADIUS_KM = 6371.0
+
+
+def geodetic_to_ecef(lat_deg: float, lon_deg: float,
+                     alt_km: float = 0.0) -> Tuple[float, float, float]:
+    """
+    Convert (latitude, longitude, altitude) on a spherical Earth to
+    Earth-centered (x, y, z) in km - the coordinate form astar() expects.
+    """
+    lat = math.radians(lat_deg)
+    lon = math.radians(lon_deg)
+    r = EARTH_RADIUS_KM + alt_km
+    return (r * math.cos(lat) * math.cos(lon),
+            r * math.cos(lat) * math.sin(lon),
+            r * math.sin(lat))
+
+
+def reverse_graph(graph):
+    """
+    Incoming-edge view of a graph, needed by the backward half of
+    bidirectional_dijkstra. Build it once per topology and reuse it;
+    symmetric ISL meshes can simply pass the graph itself.
+
+    Time Complexity: O(V + E)
+    """
+    if isinstance(graph, CSRGraph):
+        n = graph.num_nodes
+        counts = [0] * (n + 1)
+        for v in graph.indices:
+            counts[v + 1] += 1
+        for i in range(n):
+            counts[i + 1] += counts[i]
+        indptr = array('q', counts)
+        fill = counts[:-1]
+        indices = array('i', [0]) * graph.num_edges
+        weights = array('q' if graph.integral else 'd', [0]) * graph.num_edges
+        for u in range(n):
+            for v, weight in graph.neighbors(u):
+                slot = fill[v]
+                indices[slot] = u
+                weights[slot] = weight
+                fill[v] = slot + 1
+        return CSRGraph(indptr, indices, weights, graph.node_ids)
+
+    reverse = {node: [] for node in graph}
+    for node, neighbors in graph.items():
+        for neighbor, weight in neighbors:
+            reverse.setdefault(neighbor, []).append((node, weight))
+    return reverse
+
+
+def _edges_of(graph):
+    """
+    Return (expand, start/end translator, path translator) so the search
+    code below runs unchanged on adjacency dicts and on CSR graphs.
+    """
+    if isinstance(graph, CSRGraph):
+        indptr, indices, weights = graph.indptr, graph.indices, graph.weights
+
+        def expand(u):
+            lo, hi = indptr[u], indptr[u + 1]
+            return zip(indices[lo:hi], weights[lo:hi])
+
+        ids = graph.node_ids
+        return expand, graph.node_index.get, lambda path: [ids[i] for i in path]
+
+    empty = []
+    return (lambda u: graph.get(u, empty)), (lambda node: node), (lambda path: path)
+
+
+def _unwind(previous: Dict, node) -> List:
+    """Follow predecessor links back to the root (root first)."""
+    path = [node]
+    while node in previous:
+        node = previous[node]
+        path.append(node)
+    path.reverse()
+    return path
+
+
+def bidirectional_dijkstra(graph, start, end, reverse=None) -> Tuple[float, List]:
+    """
+    Point-to-point shortest path growing one ball from start and one from
+    end until they meet.
+
+    Two balls of radius d/2 settle far fewer nodes than one ball of
+    radius d - on a near-planar mesh roughly half as many.
+
+    Args:
+        graph: adjacency dict or CSRGraph
+        start, end: node IDs
+        reverse: incoming-edge graph from reverse_graph(graph); pass
+                 graph itself for symmetric meshes. Built on demand if
+                 omitted (O(E) - precompute it for repeated queries).
+
+    Returns:
+        (shortest_distance, path_as_list), same contract as
+        dijkstra_with_path: (float('inf'), []) if no path exists
+
+    Time Complexity: O((V + E) log V) worst case, typically much less
+    """
+    if start == end:
+        return (0, [start])
+    if reverse is None:
+        reverse = reverse_graph(graph)
+
+    forward_edges, translate, untranslate = _edges_of(graph)
+    backward_edges, _, _ = _edges_of(reverse)
+    s, t = translate(start), translate(end)
+    if s is None or t is None:
+        return (float('inf'), [])
+
+    dist = ({s: 0}, {t: 0})
+    previous = ({}, {})
+    settled = (set(), set())
+    queues = ([(0, s)], [(0, t)])
+    expand = (forward_edges, backward_edges)
+
+    best = INF
+    meeting = None
+
+    while queues[0] and queues[1]:
+        # Stop once no undiscovered path can beat the best meeting found
+        if queues[0][0][0] + queues[1][0][0] >= best:
+            break
+
+        # Grow the smaller frontier
+        side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        other = 1 - side
+        current_distance, u = heapq.heappop(queues[side])
+        if u in settled[side]:
+            continue
+        settled[side].add(u)
+
+        for v, weight in expand[side](u):
+            distance = current_distance + weight
+            if distance < dist[side].get(v, INF):
+                dist[side][v] = distance
+                previous[side][v] = u
+                heapq.heappush(queues[side], (distance, v))
+            # Candidate meeting through edge (u, v)
+            if v in dist[other]:
+                total = current_distance + weight + dist[other][v]
+                if total < best:
+                    best = total
+                    meeting = v
+
+    if meeting is None:
+        return (float('inf'), [])
+
+    path = _unwind(previous[0], meeting)
+    path.extend(reversed(_unwind(previous[1], meeting)[:-1]))
+    return (best, untranslate(path))
+
+
+def astar(graph, start, end, coords: Dict, speed: float = C_KM_PER_MS) -> Tuple[float, List]:
+    """
+    Point-to-point shortest path guided by a light-time lower bound.
+
+    Heuristic: straight-line (line-of-sight) distance from a node to end
+    divided by the speed of light. Every link is a straight segment, so any
+    route is at least as long as the chord between its endpoints and the
+    heuristic never overestimates (admissible). A great-circle distance
+    would NOT be safe here: chords between satellites cut under the arc.
+
+    Args:
+        graph: adjacency dict or CSRGraph
+        start, end: node IDs
+        coords: {node: (x, y, z)} Earth-centered km, see geodetic_to_ecef().
+                Nodes without coordinates get heuristic 0.
+        speed: km per weight unit (default: light, weights in ms)
+
+    Returns:
+        (shortest_distance, path_as_list), same contract as
+        dijkstra_with_path
+
+    Nodes are re-opened if a shorter path turns up later, so the result
+    stays optimal even where missing coordinates make the heuristic
+    inconsistent.
+    """
+    if start == end:
+        return (0, [start])
+
+    expand, translate, untranslate = _edges_of(graph)
+    s, t = translate(start), translate(end)
+    if s is None or t is None:
+        return (float('inf'), [])
+
+    target = coords.get(end)
+    if isinstance(graph, CSRGraph):
+        ids = graph.node_ids
+        lookup = lambda u: coords.get(ids[u])
+    else:
+        lookup = coords.get
+
+    inv_speed = 1.0 / speed
+    estimates = {}
+
+    def heuristic(u):
+        h = estimates.get(u)
+        if h is None:
+            p = lookup(u)
+            h = 0.0 if p is None or target is None else math.dist(p, target) * inv_speed
+            estimates[u] = h
+        return h
+
+    dist = {s: 0}
+    previous = {}
+    open_heap = [(heuristic(s), 0, s)]  # (f = g + h, g, node)
+
+    while open_heap:
+        _, current_distance, u = heapq.heappop(open_heap)
+        if current_distance > dist[u]:
+            continue  # Stale entry
+        if u == t:
+            return (current_distance, untranslate(_unwind(previous, t)))
+
+        for v, weight in expand(u):
+            distance = current_distance + weight
+            if distance < dist.get(v, INF):
+                dist[v] = distance
+                previous[v] = u
+                heapq.heappush(open_heap, (distance + heuristic(v), distance, v))
+
+    return (float('inf'), [])
+
+
 # ============================================================================
 # EXAMPLE USAGE AND TESTS
 # ============================================================================
@@ -509,6 +1229,22 @@ if __name__ == "__main__":
     print(f"\nBest route from SAT1 to SAT6:")
     print(f"  Path: {' -> '.join(f'SAT{s}' for s in path)}")
     print(f"  Total latency: {distance}ms")
+
+    # Same query on compact array storage
+    mesh_csr = to_csr(satellite_mesh)
+    distance, path = dijkstra_with_path(mesh_csr, 1, 6)
+    print(f"\nCSR mesh: {mesh_csr.num_nodes} nodes, {mesh_csr.num_edges} edges, "
+          f"{mesh_csr.nbytes()} bytes")
+    print(f"  Path: {' -> '.join(f'SAT{s}' for s in path)} ({distance}ms)")
+
+    # Point-to-point: the mesh is symmetric, so it is its own reverse graph
+    distance, path = bidirectional_dijkstra(satellite_mesh, 1, 6, reverse=satellite_mesh)
+    print(f"Bidirectional: {' -> '.join(f'SAT{s}' for s in path)} ({distance}ms)")
+
+    # Bounded questions stop early instead of sweeping the whole mesh
+    print(f"Within 20ms of SAT1: {dijkstra(satellite_mesh, 1, cutoff=20)}")
+    for gateway, latency, path in nearest_targets(satellite_mesh, 1, [4, 5, 6], k=2):
+        print(f"  Gateway SAT{gateway}: {latency}ms via {path}")
     
     # ========================================================================
     # Example 2: Interval Merging - Coverage Analysis
@@ -0,0 +1,316 @@
+"""
+QUERY SERVICE - asyncio front-end with request coalescing
+=========================================================
+
+Concurrent route and coverage requests are collected for a short batching
+window (default 2 ms) and then grouped:
+
+    route(source, target)        one search per distinct source that stops
+                                 once all of its targets are settled
+    gaps(window_set, t0, t1)     one CoverageIndex per window set, every
+                                 range answered from it
+
+Each group is one task on an executor (threads by default, or a process
+pool that receives the CSR graph once through its initializer), so the
+event loop never runs a search itself. A batch is flushed early when it
+reaches max_batch requests.
+
+Metrics: queue depth (requests waiting when one arrives), batch size and
+end-to-end latency, each as a Histogram, plus counters via stats().
+
+USE CASE: Request handler in front of dijkstra_with_path /
+find_coverage_gaps under bursty load
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from note import INF, CSRGraph, _bounded_search, _unwind, to_csr
+from coverage_index import CoverageIndex
+from histogram import Histogram
+
+
+# ============================================================================
+# Executor-side work (module level so a process pool can run it)
+# ============================================================================
+
+_worker = {}  # Process-pool workers: graph installed by _install
+
+
+def _install(graph: CSRGraph) -> None:
+    _worker['graph'] = graph
+
+
+def _route_batch(source: Hashable, targets: List[Hashable],
+                 graph: Optional[CSRGraph] = None) -> List[Tuple[float, List]]:
+    """
+    One multi-target search from source that stops once every requested
+    target is settled (a single target costs what dijkstra_with_path
+    does), then every target's path off it.
+    """
+    graph = graph if graph is not None else _worker['graph']
+    settled, previous = _bounded_search(graph, source, targets=targets)
+    results = []
+    for target in targets:
+        if target in settled:
+            results.append((settled[target], _unwind(previous, target)))
+        else:
+            results.append((INF, []))
+    return results
+
+
+def _gap_batch(index: CoverageIndex, ranges: List[Tuple[float, float]]
+               ) -> List[List[Tuple[float, float]]]:
+    return [index.gaps(t0, t1) for t0, t1 in ranges]
+
+
+# ============================================================================
+# Service
+# ============================================================================
+
+class QueryService:
+    """
+    Coalescing query front-end. Use inside a running event loop:
+
+        async with QueryService(mesh) as service:
+            distance, path = await service.route(1, 6)
+
+    Args:
+        graph: adjacency dict or CSRGraph (converted to CSR once)
+        batch_window: seconds to collect requests before a flush
+        max_batch: flush as soon as this many requests are waiting
+        executor: any concurrent.futures.Executor (a caller-supplied process
+                  pool gets the graph pickled with each batch); if None, one
+                  is created from `processes` and shut down by stop()
+        processes: None/1 = thread pool, > 1 = process pool with the graph
+                   installed per worker
+    """
+
+    def __init__(self, graph, batch_window: float = 0.002, max_batch: int = 1024,
+                 executor: Optional[Executor] = None,
+                 processes: Optional[int] = None):
+        self.graph = to_csr(graph)
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._graph_installed = False  # True once pool workers hold the graph
+        self._processes = processes
+
+        self._window_sets: Dict[Hashable, List[Tuple[float, float]]] = {}
+        self._indexes: Dict[Hashable, CoverageIndex] = {}
+        self._versions: Dict[Hashable, int] = {}  # Bumped by register_windows
+
+        # Pending requests, grouped by coalescing key
+        self._routes: Dict[Hashable, List] = {}
+        self._gaps: Dict[Hashable, List] = {}
+        self._waiting = 0
+        self._flush_handle = None
+        self._tasks = set()
+
+        self.queue_depth = Histogram.exponential(1, 2, 16)
+        self.batch_size = Histogram.exponential(1, 2, 16)
+        self.latency = Histogram.exponential(1e-5, 2, 24)
+        self.counters = {'requests': 0, 'batches': 0, 'searches': 0, 'index_builds': 0}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        if self._executor is None:
+            processes = self._processes or 1
+            if processes > 1:
+                self._executor = ProcessPoolExecutor(processes, initializer=_install,
+                                                     initargs=(self.graph,))
+                self._graph_installed = True
+            else:
+                self._executor = ThreadPoolExecutor(os.cpu_count() or 1)
+
+    async def stop(self) -> None:
+        """Flush what is waiting, wait for in-flight batches, release the pool."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def __aenter__(self) -> 'QueryService':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def register_windows(self, name: Hashable,
+                         intervals: Iterable[Tuple[float, float]]) -> None:
+        """Add or replace a named window set for gaps() queries."""
+        self._window_sets[name] = list(intervals)
+        self._versions[name] = self._versions.get(name, 0) + 1
+        self._indexes.pop(name, None)
+
+    async def route(self, source: Hashable, target: Hashable) -> Tuple[float, List]:
+        """(distance, path) - same contract as dijkstra_with_path."""
+        return await self._submit(self._routes, source, target)
+
+    async def gaps(self, window_set: Hashable, required_start: float,
+                   required_end: float) -> List[Tuple[float, float]]:
+        """Coverage gaps of a registered window set, clipped to the range."""
+        if window_set not in self._window_sets:
+            raise KeyError(window_set)
+        return await self._submit(self._gaps, window_set, (required_start, required_end))
+
+    def _submit(self, pending: Dict, key: Hashable, item) -> asyncio.Future:
+        if self._executor is None:
+            raise RuntimeError("QueryService is not started")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.queue_depth.record(self._waiting)
+        self.counters['requests'] += 1
+        pending.setdefault(key, []).append((item, future, time.perf_counter()))
+        self._waiting += 1
+
+        if self._waiting >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return future
+
+    # ------------------------------------------------------------------
+    # Batching
+    # ------------------------------------------------------------------
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._waiting:
+            return
+        self.batch_size.record(self._waiting)
+        self.counters['batches'] += 1
+        routes, self._routes = self._routes, {}
+        gaps, self._gaps = self._gaps, {}
+        self._waiting = 0
+
+        for source, items in routes.items():
+            self._spawn(self._run_routes(source, items))
+        for name, items in gaps.items():
+            self._spawn(self._run_gaps(name, items))
+
+    def _spawn(self, coroutine) -> None:
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def _run_routes(self, source: Hashable, items: List) -> None:
+        targets = [target for target, _, _ in items]
+        self.counters['searches'] += 1
+        graph = None if self._graph_installed else self.graph
+        await self._deliver(items, self._execute(_route_batch, source, targets, graph))
+
+    async def _run_gaps(self, name: Hashable, items: List) -> None:
+        await self._deliver(items, self._gap_work(name, [item for item, _, _ in items]))
+
+    async def _gap_work(self, name: Hashable, ranges: List[Tuple[float, float]]):
+        """Build the index if needed, then answer; runs under _deliver so a
+        failed build reaches every waiting future."""
+        index = self._indexes.get(name)
+        if index is None:
+            self.counters['index_builds'] += 1
+            version = self._versions[name]
+            index = await self._execute(CoverageIndex, self._window_sets[name])
+            # Cache only if register_windows didn't replace the set meanwhile
+            if self._versions.get(name) == version:
+                self._indexes.setdefault(name, index)
+        return await self._execute(_gap_batch, index, ranges)
+
+    async def _deliver(self, items: List, work) -> None:
+        try:
+            results = await work
+        except Exception as error:
+            for _, future, _ in items:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        now = time.perf_counter()
+        for (_, future, submitted), result in zip(items, results):
+            self.latency.record(now - submitted)
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict:
+        return {**self.counters,
+                'waiting': self._waiting,
+                'queue_depth': self.queue_depth.snapshot(),
+                'batch_size': self.batch_size.snapshot(),
+                'latency': self.latency.snapshot()}
+
+
+class LocalClient:
+    """In-process client: plain coroutine calls against one QueryService."""
+
+    def __init__(self, service: QueryService):
+        self.service = service
+
+    async def route(self, source: Hashable, target: Hashable) -> Tuple[float, List]:
+        return await self.service.route(source, target)
+
+    async def routes(self, pairs: Iterable[Tuple[Hashable, Hashable]]) -> List[Tuple[float, List]]:
+        """Issue every pair concurrently; results in input order."""
+        return await asyncio.gather(*(self.service.route(s, t) for s, t in pairs))
+
+    async def gaps(self, window_set: Hashable, required_start: float,
+                   required_end: float) -> List[Tuple[float, float]]:
+        return await self.service.gaps(window_set, required_start, required_end)
+
+
+if __name__ == "__main__":
+    import random
+
+    from note import dijkstra_with_path
+
+    random.seed(6)
+    n = 2000
+    mesh = {u: [] for u in range(n)}
+    for u in range(n):
+        for v in random.sample(range(n), 4):
+            if v != u:
+                w = random.randint(1, 50)
+                mesh[u].append((v, w))
+                mesh[v].append((u, w))
+
+    async def main():
+        async with QueryService(mesh) as service:
+            service.register_windows('cell-7', [(0, 300), (240, 420), (700, 900)])
+            client = LocalClient(service)
+
+            # 2000 concurrent requests from only 20 distinct sources
+            sources = random.sample(range(n), 20)
+            pairs = [(random.choice(sources), random.randrange(n)) for _ in range(2000)]
+            started = time.perf_counter()
+            results = await client.routes(pairs)
+            elapsed = time.perf_counter() - started
+            for (s, t), result in list(zip(pairs, results))[:50]:
+                assert result[0] == dijkstra_with_path(mesh, s, t)[0]
+
+            gap_lists = await asyncio.gather(*(client.gaps('cell-7', 0, t) for t in (400, 900)))
+            stats = service.stats()
+            print(f"{stats['requests'] - 2} routes in {elapsed:.3f}s: "
+                  f"{stats['searches']} searches, {stats['batches']} batches")
+            print(f"Latency p50 {stats['latency']['p50'] * 1e3:.2f} ms, "
+                  f"p99 {stats['latency']['p99'] * 1e3:.2f} ms; "
+                  f"max queue depth {stats['queue_depth']['max']:.0f}")
+            print(f"Gaps 0-400s: {gap_lists[0]}, 0-900s: {gap_lists[1]}")
+
+    asyncio.run(main())
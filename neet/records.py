@@ -0,0 +1,421 @@
+"""
+COLUMNAR RECORDS - Interned satellite IDs and compact window/event tables
+=========================================================================
+
+The interval and scheduling functions in note.py trade in tuples and dicts:
+a window is (start, end, 'SAT_A'), a handoff event is a 4-key dict that
+carries its own copy of the satellite name. At worker volume those
+per-record objects dominate memory.
+
+Here records are stored as parallel arrays instead:
+
+    SatelliteRegistry   name <-> dense int32 ID, interned once
+    WindowColumns       starts[i], ends[i], satellites[i]
+    EventColumns        satellites[i], connect_times[i], disconnect_times[i]
+                        (satellite GAP = -1 marks a coverage gap)
+    HandoffEvent        __slots__ view of one event row
+
+Times are array('q') when every value is an int and array('d') otherwise,
+like CSRGraph weights, so integer schedules come back as ints. Readable
+satellite names are only produced at the boundary (to_dicts / names).
+
+Memory: 20 bytes per window (int64/float64 start and end + int32 ID) and
+20 bytes per event, versus several hundred for a tuple with a string or an
+event dict.
+
+USE CASE: Day-long window sets and handoff plans for many terminals in one
+worker process
+"""
+
+from array import array
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from note import _sweep_handoffs
+
+GAP = -1  # Satellite ID of a coverage-gap event
+
+
+def _time_typecode(*columns, scalars: Sequence = ()) -> str:
+    """'q' if every time column/scalar is integral, 'd' otherwise."""
+    for column in columns:
+        code = getattr(column, 'typecode', None) or getattr(column, 'format', None)
+        if code is None:
+            if not all(isinstance(value, int) for value in column):
+                return 'd'
+        elif code not in 'bBhHiIlLqQ':
+            return 'd'
+    if not all(isinstance(value, int) for value in scalars if value is not None):
+        return 'd'
+    return 'q'
+
+
+def _time_array(values: Iterable, typecode: Optional[str] = None) -> array:
+    values = values if isinstance(values, (list, tuple, array)) else list(values)
+    return array(typecode or _time_typecode(values), values)
+
+
+# ============================================================================
+# Interning
+# ============================================================================
+
+class SatelliteRegistry:
+    """
+    Dense int32 IDs for satellite names, assigned in first-seen order.
+
+    One registry is shared by every table in a worker, so each name is
+    stored exactly once no matter how many windows and events refer to it.
+    """
+
+    __slots__ = ('_ids', '_names')
+
+    def __init__(self, names: Iterable[Hashable] = ()):
+        self._ids: Dict[Hashable, int] = {}
+        self._names: List[Hashable] = []
+        for name in names:
+            self.intern(name)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: Hashable) -> bool:
+        return name in self._ids
+
+    def intern(self, name: Hashable) -> int:
+        """ID for name, assigning the next free one if it is new."""
+        sat = self._ids.get(name)
+        if sat is None:
+            sat = self._ids[name] = len(self._names)
+            self._names.append(name)
+        return sat
+
+    def intern_many(self, names: Iterable[Hashable]) -> array:
+        intern = self.intern
+        return array('i', [intern(name) for name in names])
+
+    def id_of(self, name: Hashable) -> int:
+        """ID of an already interned name (KeyError otherwise)."""
+        return self._ids[name]
+
+    def name(self, sat: int) -> Optional[Hashable]:
+        """Readable name for an ID; None for GAP."""
+        return None if sat == GAP else self._names[sat]
+
+    def names(self, sats: Iterable[int]) -> List[Optional[Hashable]]:
+        name = self.name
+        return [name(sat) for sat in sats]
+
+
+# ============================================================================
+# Tables
+# ============================================================================
+
+class WindowColumns:
+    """
+    Visibility windows as three parallel arrays.
+
+    Args:
+        starts, ends: window bounds (any sequence; stored as arrays)
+        satellites: interned satellite IDs, or None for anonymous
+                    coverage windows
+    """
+
+    __slots__ = ('starts', 'ends', 'satellites')
+
+    def __init__(self, starts: Sequence[float], ends: Sequence[float],
+                 satellites: Optional[Sequence[int]] = None):
+        if len(starts) != len(ends):
+            raise ValueError("starts and ends must have the same length")
+        if satellites is not None and len(satellites) != len(starts):
+            raise ValueError("satellites must have one entry per window")
+        typecode = _time_typecode(starts, ends)
+        self.starts = _time_array(starts, typecode)
+        self.ends = _time_array(ends, typecode)
+        self.satellites = None if satellites is None else array('i', satellites)
+
+    @classmethod
+    def from_intervals(cls, intervals: Iterable[Tuple],
+                       registry: Optional[SatelliteRegistry] = None) -> 'WindowColumns':
+        """
+        Build from note.py-style (start, end) or (start, end, satellite_id)
+        tuples. With a registry the third field is interned.
+        """
+        starts, ends, sats = [], [], []
+        for window in intervals:
+            starts.append(window[0])
+            ends.append(window[1])
+            if registry is not None:
+                sats.append(registry.intern(window[2]))
+        return cls(starts, ends, sats if registry is not None else None)
+
+    @classmethod
+    def from_dicts(cls, satellites: Iterable[Dict],
+                   registry: SatelliteRegistry) -> 'WindowColumns':
+        """Build from optimal_handoff_schedule()'s {'id', 'start', 'end'} dicts."""
+        starts, ends, sats = [], [], []
+        for sat in satellites:
+            starts.append(sat['start'])
+            ends.append(sat['end'])
+            sats.append(registry.intern(sat['id']))
+        return cls(starts, ends, sats)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def sort_order(self) -> List[int]:
+        """Rows ordered by (start, end)."""
+        starts, ends = self.starts, self.ends
+        return sorted(range(len(starts)), key=lambda i: (starts[i], ends[i]))
+
+    def take(self, rows: Sequence[int]) -> 'WindowColumns':
+        """New table with the given rows, in that order."""
+        taken = WindowColumns.__new__(WindowColumns)
+        starts, ends, sats = self.starts, self.ends, self.satellites
+        taken.starts = array(starts.typecode, [starts[i] for i in rows])
+        taken.ends = array(ends.typecode, [ends[i] for i in rows])
+        taken.satellites = None if sats is None else array('i', [sats[i] for i in rows])
+        return taken
+
+    def to_intervals(self, registry: Optional[SatelliteRegistry] = None) -> List[Tuple]:
+        """Back to tuples: (start, end), or (start, end, name) with a registry."""
+        if registry is None or self.satellites is None:
+            return list(zip(self.starts, self.ends))
+        return list(zip(self.starts, self.ends, registry.names(self.satellites)))
+
+    def nbytes(self) -> int:
+        return sum(len(a) * a.itemsize
+                   for a in (self.starts, self.ends, self.satellites) if a is not None)
+
+
+class HandoffEvent:
+    """One handoff event (or gap, satellite == GAP) without a per-event dict."""
+
+    __slots__ = ('satellite', 'connect_time', 'disconnect_time')
+
+    def __init__(self, satellite: int, connect_time: float, disconnect_time: float):
+        self.satellite = satellite
+        self.connect_time = connect_time
+        self.disconnect_time = disconnect_time
+
+    @property
+    def is_gap(self) -> bool:
+        return self.satellite == GAP
+
+    @property
+    def duration(self) -> float:
+        return self.disconnect_time - self.connect_time
+
+    def __repr__(self) -> str:
+        label = 'GAP' if self.is_gap else f"sat={self.satellite}"
+        return f"HandoffEvent({label}, {self.connect_time}, {self.disconnect_time})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, HandoffEvent):
+            return NotImplemented
+        return (self.satellite, self.connect_time, self.disconnect_time) == \
+               (other.satellite, other.connect_time, other.disconnect_time)
+
+    def to_dict(self, registry: SatelliteRegistry) -> Dict:
+        """The dict handoff_plan() would have produced for this event."""
+        if self.is_gap:
+            return {'type': 'GAP', 'start': self.connect_time,
+                    'end': self.disconnect_time, 'duration': self.duration}
+        return {'satellite': registry.name(self.satellite),
+                'connect_time': self.connect_time,
+                'disconnect_time': self.disconnect_time,
+                'duration': self.duration}
+
+
+class EventColumns:
+    """Handoff events as three parallel arrays, in time order."""
+
+    __slots__ = ('satellites', 'connect_times', 'disconnect_times')
+
+    def __init__(self, typecode: str = 'q'):
+        self.satellites = array('i')
+        self.connect_times = array(typecode)
+        self.disconnect_times = array(typecode)
+
+    def append(self, satellite: int, connect_time: float, disconnect_time: float) -> None:
+        self.satellites.append(satellite)
+        self.connect_times.append(connect_time)
+        self.disconnect_times.append(disconnect_time)
+
+    def __len__(self) -> int:
+        return len(self.satellites)
+
+    def __getitem__(self, i: int) -> HandoffEvent:
+        return HandoffEvent(self.satellites[i], self.connect_times[i],
+                            self.disconnect_times[i])
+
+    def __iter__(self) -> Iterator[HandoffEvent]:
+        for sat, connect_time, disconnect_time in zip(
+                self.satellites, self.connect_times, self.disconnect_times):
+            yield HandoffEvent(sat, connect_time, disconnect_time)
+
+    def has_gaps(self) -> bool:
+        return GAP in self.satellites
+
+    def gaps(self) -> List[Tuple[float, float]]:
+        return [(c, d) for sat, c, d in zip(self.satellites, self.connect_times,
+                                            self.disconnect_times) if sat == GAP]
+
+    def to_dicts(self, registry: SatelliteRegistry) -> List[Dict]:
+        """Boundary conversion to handoff_plan()'s list of dicts."""
+        return [event.to_dict(registry) for event in self]
+
+    def nbytes(self) -> int:
+        return sum(len(a) * a.itemsize
+                   for a in (self.satellites, self.connect_times, self.disconnect_times))
+
+
+# ============================================================================
+# Columnar interval functions (same results as note.py, arrays in and out)
+# ============================================================================
+
+def merge_columns(starts: Sequence[float], ends: Sequence[float]) -> Tuple[array, array]:
+    """
+    merge_intervals() on parallel arrays. Inputs are not modified.
+
+    Returns:
+        (merged_starts, merged_ends) as arrays
+
+    Time Complexity: O(n log n)
+    """
+    typecode = _time_typecode(starts, ends)
+    merged_starts, merged_ends = array(typecode), array(typecode)
+    for i in sorted(range(len(starts)), key=starts.__getitem__):
+        start, end = starts[i], ends[i]
+        if merged_ends and start <= merged_ends[-1]:  # Overlapping or touching
+            if end > merged_ends[-1]:
+                merged_ends[-1] = end
+        else:
+            merged_starts.append(start)
+            merged_ends.append(end)
+    return merged_starts, merged_ends
+
+
+def coverage_gaps_columns(starts: Sequence[float], ends: Sequence[float],
+                          required_start: float,
+                          required_end: float) -> Tuple[array, array]:
+    """find_coverage_gaps() on parallel arrays: (gap_starts, gap_ends)."""
+    typecode = _time_typecode(starts, ends, scalars=(required_start, required_end))
+    gap_starts, gap_ends = array(typecode), array(typecode)
+    if not len(starts):
+        gap_starts.append(required_start)
+        gap_ends.append(required_end)
+        return gap_starts, gap_ends
+
+    position = required_start
+    for start, end in zip(*merge_columns(starts, ends)):
+        if start > position:
+            gap_starts.append(position)
+            gap_ends.append(start)
+        position = max(position, end)
+    if position < required_end:
+        gap_starts.append(position)
+        gap_ends.append(required_end)
+    return gap_starts, gap_ends
+
+
+def continuous_coverage_columns(starts: Sequence[float], ends: Sequence[float],
+                                start_time: float, end_time: float) -> bool:
+    """has_continuous_coverage() on parallel arrays."""
+    return len(coverage_gaps_columns(starts, ends, start_time, end_time)[0]) == 0
+
+
+def max_concurrent_columns(starts: Sequence[float], ends: Sequence[float]) -> int:
+    """max_concurrent_satellites() on parallel arrays (touching windows overlap)."""
+    n = len(starts)
+    if not n:
+        return 0
+    # Event k < n is start k, k >= n is end k - n; starts first at equal times
+    order = sorted(range(2 * n),
+                   key=lambda k: (starts[k], 0) if k < n else (ends[k - n], 1))
+    peak = current = 0
+    for k in order:
+        if k < n:
+            current += 1
+            if current > peak:
+                peak = current
+        else:
+            current -= 1
+    return peak
+
+
+# ============================================================================
+# Columnar scheduling
+# ============================================================================
+
+def handoff_columns(windows: WindowColumns, start_time: Optional[float] = None,
+                    end_time: Optional[float] = None) -> EventColumns:
+    """
+    handoff_plan() on a WindowColumns table with interned satellites.
+
+    Returns:
+        EventColumns; gaps have satellite GAP. to_dicts(registry) gives
+        handoff_plan()'s output (among windows with identical start and
+        end, ties go to the first row rather than the smallest name).
+
+    Time Complexity: O(n log n)
+    """
+    if windows.satellites is None:
+        raise ValueError("handoff scheduling needs satellite IDs")
+    order = windows.sort_order()
+    starts = [windows.starts[i] for i in order]
+    ends = [windows.ends[i] for i in order]
+    sats = windows.satellites
+
+    events = EventColumns(_time_typecode(windows.starts, windows.ends,
+                                         scalars=(start_time, end_time)))
+    for row, connect_time, disconnect_time in _sweep_handoffs(
+            starts, ends, 0, len(order), start_time, end_time):
+        events.append(GAP if row < 0 else sats[order[row]], connect_time, disconnect_time)
+    return events
+
+
+def min_handoffs_columns(windows: WindowColumns) -> array:
+    """min_handoffs_schedule(): satellite IDs in order, empty on any gap."""
+    events = handoff_columns(windows)
+    if events.has_gaps():
+        return array('i')
+    return events.satellites
+
+
+def optimal_handoff_columns(windows: WindowColumns) -> EventColumns:
+    """optimal_handoff_schedule(): coverage tracked from t=0."""
+    if not len(windows):
+        return EventColumns(windows.starts.typecode)
+    return handoff_columns(windows, start_time=0)
+
+
+if __name__ == "__main__":
+    import random
+    import sys
+    import tracemalloc
+
+    from note import optimal_handoff_schedule
+
+    random.seed(5)
+    constellation = [f"STARLINK-{n}" for n in range(4000)]
+    satellites = []
+    t = 0
+    for _ in range(50_000):
+        t += random.randint(0, 120)
+        satellites.append({'id': random.choice(constellation), 'start': t,
+                           'end': t + random.randint(200, 900)})
+
+    tracemalloc.start()
+    reference = optimal_handoff_schedule(satellites)
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    registry = SatelliteRegistry()
+    windows = WindowColumns.from_dicts(satellites, registry)
+    events = optimal_handoff_columns(windows)
+    assert events.to_dicts(registry) == reference
+
+    print(f"{len(satellites)} windows, {len(registry)} satellites -> {len(events)} events")
+    print(f"  dict events:     ~{dict_bytes / len(reference):.0f} bytes/event")
+    print(f"  columnar events: {events.nbytes() / len(events):.0f} bytes/event, "
+          f"windows {windows.nbytes() / len(windows):.0f} bytes/window")
+    print(f"  HandoffEvent view: {sys.getsizeof(events[0])} bytes, first = {events[0]}")
@@ -0,0 +1,244 @@
+"""
+TOPOLOGY-EPOCH-AWARE ROUTE CACHE
+================================
+
+Answers repeated dijkstra_with_path(graph, start, end) queries between
+topology updates without redoing the search.
+
+The unit of caching is a per-source search tree that can be RESUMED:
+answering (start, end) grows Dijkstra from start only until end is settled
+and keeps the heap. A later query for another destination from the same
+source is either answered straight from the settled part (a hit) or by
+continuing the same search (a resume) - never by starting over.
+
+Edge changes go through the cache, which bumps the topology version and
+invalidates precisely:
+
+    weight increase / link down (u, v):
+        evict a tree only if (u, v) is its tree edge into v
+    weight decrease / link up (u, v):
+        evict a tree only if u is settled and u -> v now beats the label of
+        v by enough to reach inside the settled ball; otherwise just relax
+        the new edge into the saved frontier - the tree stays usable
+
+Everything that survives is valid for the new version. Trees are evicted
+least-recently-used once more than `capacity` sources are cached.
+
+USE CASE: API layer answering hot (ground station, ground station) pairs
+"""
+
+import heapq
+from collections import OrderedDict, defaultdict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from note import INF, CSRGraph
+
+
+class _SearchTree:
+    """Resumable Dijkstra state from one source."""
+
+    __slots__ = ('source', 'dist', 'pred', 'settled', 'heap', 'radius')
+
+    def __init__(self, source):
+        self.source = source
+        self.dist = {source: 0}
+        self.pred = {}
+        self.settled = set()
+        self.heap = [(0, source)]
+        self.radius = 0  # Distance of the last settled node
+
+
+class RouteCache:
+    """
+    Bounded LRU cache of shortest-path trees over a mutable topology.
+
+    Args:
+        graph: adjacency dict {node: [(neighbor, weight), ...]} or CSRGraph.
+               The cache keeps its own copy - apply changes through
+               update_edge / delete_edge so it can invalidate.
+        capacity: maximum number of source trees kept
+        version: starting topology version
+    """
+
+    def __init__(self, graph, capacity: int = 128, version: int = 0):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.hits = 0
+        self.resumes = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._trees = OrderedDict()  # source -> _SearchTree, LRU order
+        self.version = version
+        self._load(graph)
+
+    # ------------------------------------------------------------------
+    # Topology
+    # ------------------------------------------------------------------
+
+    def _load(self, graph) -> None:
+        if isinstance(graph, CSRGraph):
+            graph = graph.to_adjacency()
+        self._out = defaultdict(dict)
+        for u, neighbors in graph.items():
+            for v, weight in neighbors:
+                if weight < self._out[u].get(v, INF):
+                    self._out[u][v] = weight
+
+    def set_topology(self, graph, version: Optional[int] = None) -> None:
+        """Load a new snapshot; drops every cached tree."""
+        self._load(graph)
+        self.invalidations += len(self._trees)
+        self._trees.clear()
+        self.version = self.version + 1 if version is None else version
+
+    def update_edge(self, u: Hashable, v: Hashable, weight: float) -> int:
+        """
+        Set (or insert) edge u -> v and invalidate affected trees.
+
+        Returns:
+            Number of cached trees evicted by this change
+        """
+        old = self._out[u].get(v)
+        if weight == old:
+            return 0
+        self._out[u][v] = weight
+        self.version += 1
+        if old is not None and weight > old:
+            return self._invalidate_worse(u, v)
+        return self._invalidate_better(u, v, weight)
+
+    def delete_edge(self, u: Hashable, v: Hashable) -> int:
+        """
+        Remove edge u -> v and invalidate affected trees; a missing edge
+        changes nothing.
+
+        Returns:
+            Number of cached trees evicted by this change
+        """
+        if self._out.get(u, {}).pop(v, None) is None:
+            return 0
+        self.version += 1
+        return self._invalidate_worse(u, v)
+
+    def _drop(self, sources) -> int:
+        for source in sources:
+            del self._trees[source]
+        self.invalidations += len(sources)
+        return len(sources)
+
+    def _invalidate_worse(self, u, v) -> int:
+        # Only a tree whose label for v came through u can get longer
+        return self._drop([s for s, tree in self._trees.items()
+                           if tree.pred.get(v) == u])
+
+    def _invalidate_better(self, u, v, weight) -> int:
+        stale = []
+        for source, tree in self._trees.items():
+            if u not in tree.settled:
+                continue  # Edge is relaxed with its new weight when u settles
+            candidate = tree.dist[u] + weight
+            if candidate >= tree.dist.get(v, INF):
+                continue
+            if v in tree.settled or candidate < tree.radius:
+                # A settled distance just got beaten, or could be by a path
+                # through v (its new label is inside the settled ball)
+                stale.append(source)
+            else:
+                tree.dist[v] = candidate
+                tree.pred[v] = u
+                heapq.heappush(tree.heap, (candidate, v))
+        return self._drop(stale)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def route(self, start: Hashable, end: Hashable) -> Tuple[float, List[Hashable]]:
+        """
+        Same contract as dijkstra_with_path(graph, start, end):
+        (shortest_distance, path) or (float('inf'), []) if unreachable.
+        """
+        tree = self._tree(start, end)
+        if end not in tree.settled:
+            return (float('inf'), [])
+
+        path = [end]
+        while path[-1] != start:
+            path.append(tree.pred[path[-1]])
+        path.reverse()
+        return (tree.dist[end], path)
+
+    def distances(self, start: Hashable) -> Dict[Hashable, float]:
+        """Full dijkstra(graph, start) result, completing the cached tree."""
+        tree = self._tree(start, None)
+        return {node: tree.dist[node] for node in tree.settled}
+
+    def _tree(self, start, end) -> _SearchTree:
+        """Fetch (or create) the tree for start and grow it until end settles."""
+        tree = self._trees.get(start)
+        if tree is None:
+            self.misses += 1
+            tree = _SearchTree(start)
+            self._trees[start] = tree
+            if len(self._trees) > self.capacity:
+                self._trees.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._trees.move_to_end(start)
+            if end in tree.settled or not tree.heap:
+                self.hits += 1
+            else:
+                self.resumes += 1
+
+        if end not in tree.settled:
+            self._grow(tree, end)
+        return tree
+
+    def _grow(self, tree: _SearchTree, end) -> None:
+        dist, pred, settled, heap = tree.dist, tree.pred, tree.settled, tree.heap
+        out = self._out
+        while heap:
+            current_distance, u = heapq.heappop(heap)
+            if u in settled or current_distance > dist[u]:
+                continue
+            settled.add(u)
+            tree.radius = current_distance
+            for v, weight in out.get(u, {}).items():
+                distance = current_distance + weight
+                if distance < dist.get(v, INF):
+                    dist[v] = distance
+                    pred[v] = u
+                    heapq.heappush(heap, (distance, v))
+            if u == end:
+                return
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'version': self.version,
+            'trees': len(self._trees),
+            'hits': self.hits,
+            'resumes': self.resumes,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+
+if __name__ == "__main__":
+    satellite_mesh = {
+        1: [(2, 10), (3, 15)],
+        2: [(1, 10), (4, 20), (5, 8)],
+        3: [(1, 15), (5, 12)],
+        4: [(2, 20), (6, 5)],
+        5: [(2, 8), (3, 12), (6, 10)],
+        6: [(4, 5), (5, 10)]
+    }
+
+    cache = RouteCache(satellite_mesh, capacity=4)
+    print(cache.route(1, 6), cache.route(1, 6), cache.route(1, 4))
+    cache.update_edge(3, 1, 99)   # Not on any tree from 1: nothing evicted
+    print(cache.route(1, 6), cache.stats())
+    cache.update_edge(2, 5, 30)   # Tree edge of 1 -> 5: tree evicted
+    print(cache.route(1, 6), cache.stats())
@@ -0,0 +1,347 @@
+"""
+MEMORY-MAPPED SNAPSHOTS - Topology and visibility on disk, zero-copy
+====================================================================
+
+A worker that parses the mesh and the window set into dicts and tuples
+pays for it at startup and keeps a private copy. A snapshot file holds the
+same data as raw typed arrays; open_snapshot() maps it read-only and hands
+out memoryviews into the mapping, so N workers opening one file share one
+copy in the page cache and can query as soon as the header is read.
+
+File layout (version 1):
+
+    header    magic 'NEETSNAP', version u16, byte order u8, section count u32
+    table     per section: name (24 bytes), array typecode, offset, count
+    sections  each 64-byte aligned, native byte order:
+
+        indptr, indices, weights     CSRGraph arrays
+        node_ids                     JSON list (ints / strings / floats)
+        coords                       3 doubles per node, x y z in km (NaN = none)
+        window_starts, window_ends   windows sorted by (start, end)
+        window_satellites            interned satellite ID per window
+        satellite_names              JSON list, index = satellite ID
+
+The graph comes back as a CSRGraph whose arrays ARE the mapped memory, so
+dijkstra(), astar() and friends run on it unchanged. Only node_ids and its
+reverse index become Python objects (O(V), not O(E)).
+
+USE CASE: Dozens of routing / coverage workers starting from one snapshot
+published by the propagator
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Optional, Tuple
+
+from note import CSRGraph, to_csr
+from records import SatelliteRegistry, WindowColumns
+
+MAGIC = b'NEETSNAP'
+VERSION = 1
+ALIGNMENT = 64
+
+_HEADER = struct.Struct('<8sHBxI')     # magic, version, byte order, sections
+_SECTION = struct.Struct('<24sc7xQQ')  # name, typecode, offset, count
+_BYTE_ORDERS = {'little': 1, 'big': 2}
+_TYPECODES = frozenset('bBhHiIlLqQfd')  # What memoryview.cast() accepts
+
+
+class SnapshotError(ValueError):
+    """File is not a readable snapshot (bad magic, version or layout)."""
+
+
+def _json_section(values) -> array:
+    for value in values:
+        if not isinstance(value, (int, float, str)):
+            raise TypeError(f"snapshot IDs must be int, float or str, not {type(value).__name__}")
+    return array('B', json.dumps(list(values)).encode())
+
+
+def write_snapshot(path: str, graph=None, coords: Optional[Dict] = None,
+                   windows: Optional[WindowColumns] = None,
+                   registry: Optional[SatelliteRegistry] = None) -> int:
+    """
+    Write a snapshot file.
+
+    Args:
+        graph: adjacency dict or CSRGraph (optional)
+        coords: {node: (x, y, z)} as astar() takes them; requires graph
+        windows: WindowColumns; stored sorted by (start, end)
+        registry: names for windows.satellites (optional)
+
+    Returns:
+        bytes written
+    """
+    sections = {}
+    if graph is not None:
+        csr = to_csr(graph)
+        sections['indptr'] = array('q', csr.indptr)
+        sections['indices'] = array('i', csr.indices)
+        sections['weights'] = array('q' if csr.integral else 'd', csr.weights)
+        sections['node_ids'] = _json_section(csr.node_ids)
+        if coords is not None:
+            flat = array('d')
+            for node in csr.node_ids:
+                flat.extend(coords.get(node, (float('nan'),) * 3))
+            sections['coords'] = flat
+    elif coords is not None:
+        raise ValueError("coords are stored per graph node and need a graph")
+
+    if windows is not None:
+        ordered = windows.take(windows.sort_order())
+        sections['window_starts'] = ordered.starts
+        sections['window_ends'] = ordered.ends
+        if ordered.satellites is not None:
+            sections['window_satellites'] = ordered.satellites
+        if registry is not None:
+            sections['satellite_names'] = _json_section(registry.names(range(len(registry))))
+
+    # Lay out: header + table, then each section at the next aligned offset
+    offset = _HEADER.size + _SECTION.size * len(sections)
+    table = []
+    for name, data in sections.items():
+        assert len(name) <= 24, name
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        table.append((name, data, offset))
+        offset += len(data) * data.itemsize
+
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, _BYTE_ORDERS[sys.byteorder], len(table)))
+        for name, data, start in table:
+            f.write(_SECTION.pack(name.encode(), data.typecode.encode(), start, len(data)))
+        for name, data, start in table:
+            f.write(b'\0' * (start - f.tell()))
+            data.tofile(f)
+        return f.tell()
+
+
+class CoordinateView:
+    """Read-only {node: (x, y, z)} mapping over the mapped coords section."""
+
+    __slots__ = ('_flat', '_node_index')
+
+    def __init__(self, flat: memoryview, node_index: Dict):
+        self._flat = flat
+        self._node_index = node_index
+
+    def get(self, node, default=None) -> Optional[Tuple[float, float, float]]:
+        i = self._node_index.get(node)
+        if i is None:
+            return default
+        x = self._flat[3 * i]
+        if x != x:  # NaN: node stored without coordinates
+            return default
+        return (x, self._flat[3 * i + 1], self._flat[3 * i + 2])
+
+    def __getitem__(self, node) -> Tuple[float, float, float]:
+        xyz = self.get(node)
+        if xyz is None:
+            raise KeyError(node)
+        return xyz
+
+    def __contains__(self, node) -> bool:
+        return self.get(node) is not None
+
+
+class Snapshot:
+    """
+    An open snapshot. Attributes are None for sections the file lacks.
+
+        graph       CSRGraph over the mapped arrays
+        coords      CoordinateView, usable as astar()'s coords
+        windows     WindowColumns-shaped: starts / ends / satellites are
+                    memoryviews, sorted by (start, end)
+        registry    SatelliteRegistry for window satellite IDs
+
+    Everything handed out points into the mapping. close() releases the
+    views and attributes above; buffers the caller took from them
+    (slices, numpy.frombuffer arrays, ...) stay valid and keep the file
+    mapped until they are dropped. Use as a context manager.
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise SnapshotError("file too short for a snapshot header")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = []
+        try:
+            self._sections = self._read_table()
+            self._load()
+        except Exception:
+            self.close()
+            raise
+
+    def _read_table(self) -> Dict[str, Tuple[str, int, int]]:
+        buf = self._mmap
+        if len(buf) < _HEADER.size:
+            raise SnapshotError("file too short for a snapshot header")
+        magic, version, byte_order, count = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise SnapshotError("not a snapshot file")
+        if version != VERSION:
+            raise SnapshotError(f"unsupported snapshot version {version}")
+        if byte_order != _BYTE_ORDERS[sys.byteorder]:
+            raise SnapshotError("snapshot was written with a different byte order")
+
+        sections = {}
+        for k in range(count):
+            raw_name, typecode, offset, length = _SECTION.unpack_from(
+                buf, _HEADER.size + k * _SECTION.size)
+            typecode = typecode.decode('latin-1')
+            if typecode not in _TYPECODES:
+                raise SnapshotError(f"section {k} has unknown typecode {typecode!r}")
+            if offset + length * array(typecode).itemsize > len(buf):
+                raise SnapshotError("section runs past the end of the file")
+            sections[raw_name.rstrip(b'\0').decode()] = (typecode, offset, length)
+        return sections
+
+    def _view(self, name: str) -> Optional[memoryview]:
+        if name not in self._sections:
+            return None
+        typecode, offset, length = self._sections[name]
+        raw = memoryview(self._mmap)[offset:offset + length * array(typecode).itemsize]
+        view = raw.cast(typecode)
+        self._views += [raw, view]
+        return view
+
+    def _json(self, name: str) -> Optional[list]:
+        view = self._view(name)
+        return None if view is None else json.loads(bytes(view))
+
+    def _load(self) -> None:
+        self.graph = self.coords = self.windows = self.registry = None
+
+        indptr = self._view('indptr')
+        if indptr is not None:
+            self.graph = CSRGraph(indptr, self._view('indices'), self._view('weights'),
+                                  self._json('node_ids'))
+            flat = self._view('coords')
+            if flat is not None:
+                self.coords = CoordinateView(flat, self.graph.node_index)
+
+        starts = self._view('window_starts')
+        if starts is not None:
+            self.windows = WindowColumns.__new__(WindowColumns)
+            self.windows.starts = starts
+            self.windows.ends = self._view('window_ends')
+            self.windows.satellites = self._view('window_satellites')
+            names = self._json('satellite_names')
+            if names is not None:
+                self.registry = SatelliteRegistry(names)
+
+    def sections(self) -> Dict[str, int]:
+        """Section name -> element count."""
+        return {name: length for name, (_, _, length) in self._sections.items()}
+
+    def close(self) -> None:
+        """
+        Release every view, then unmap the file. Safe to call twice.
+
+        Buffers the caller still holds on the mapping (slices of a view,
+        numpy.frombuffer arrays, ...) cannot be invalidated: close() then
+        drops this snapshot's references instead of raising, and the file
+        stays mapped until the last such buffer is gone.
+        """
+        self.graph = self.coords = self.windows = self.registry = None
+        for view in reversed(self._views):
+            try:
+                view.release()
+            except BufferError:
+                pass  # Re-exported by the caller; freed along with it
+        self._views = []
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # Unmapped when the caller's last buffer is released
+
+    def __enter__(self) -> 'Snapshot':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_snapshot(path: str) -> Snapshot:
+    """Map a snapshot file read-only; see Snapshot."""
+    return Snapshot(path)
+
+
+def _worker_query(args):
+    path, source, target = args
+    from note import astar
+    with open_snapshot(path) as snap:
+        return astar(snap.graph, source, target, snap.coords)
+
+
+if __name__ == "__main__":
+    import math
+    import random
+    import tempfile
+    import time
+    from multiprocessing import Pool
+
+    from note import C_KM_PER_MS, dijkstra, geodetic_to_ecef
+    from records import merge_columns
+
+    # 40 x 40 +grid mesh with coordinates and a day of windows
+    planes, per_plane = 40, 40
+    coords = {p * per_plane + s: geodetic_to_ecef(80 * math.sin(2 * math.pi * s / per_plane),
+                                                  360 * p / planes, 550)
+              for p in range(planes) for s in range(per_plane)}
+    mesh = {}
+    for p in range(planes):
+        for s in range(per_plane):
+            node = p * per_plane + s
+            neighbors = (p * per_plane + (s + 1) % per_plane,
+                         p * per_plane + (s - 1) % per_plane,
+                         ((p + 1) % planes) * per_plane + s,
+                         ((p - 1) % planes) * per_plane + s)
+            mesh[node] = [(v, round(math.dist(coords[node], coords[v]) / C_KM_PER_MS, 3))
+                          for v in neighbors]
+
+    random.seed(4)
+    registry = SatelliteRegistry()
+    rows = [(t, t + random.randint(200, 900), f"SAT-{random.randrange(1600)}")
+            for t in sorted(random.randrange(86_400) for _ in range(20_000))]
+    windows = WindowColumns.from_intervals(rows, registry)
+
+    path = os.path.join(tempfile.mkdtemp(), 'mesh.snap')
+    size = write_snapshot(path, mesh, coords, windows, registry)
+    print(f"Snapshot: {size / 1e6:.2f} MB")
+
+    t0 = time.perf_counter()
+    with open_snapshot(path) as snap:
+        opened = time.perf_counter() - t0
+        print(f"Opened in {opened * 1e3:.2f} ms: {snap.sections()}")
+        assert dijkstra(snap.graph, 0) == dijkstra(mesh, 0)
+        assert list(zip(*merge_columns(snap.windows.starts, snap.windows.ends))) == \
+            list(zip(*merge_columns(windows.starts, windows.ends)))
+        print(f"Window 0: {snap.registry.name(snap.windows.satellites[0])}")
+
+    with Pool(2) as pool:
+        results = pool.map(_worker_query, [(path, 0, t) for t in (399, 820, 1599)])
+    for (distance, route), target in zip(results, (399, 820, 1599)):
+        print(f"Worker astar 0 -> {target}: {distance:.3f} ms over {len(route) - 1} hops")
+
+    # A caller still holding a slice doesn't stop close()
+    snap = open_snapshot(path)
+    held = snap.windows.starts[:3]
+    snap.close()
+    snap.close()
+    assert list(held) == list(windows.take(windows.sort_order()).starts[:3])
+    del held
+
+    empty = path + '.empty'
+    open(empty, 'wb').close()
+    try:
+        open_snapshot(empty)
+        raise AssertionError("empty file opened")
+    except SnapshotError:
+        pass
+    os.remove(empty)
+    os.remove(path)
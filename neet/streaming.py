@@ -0,0 +1,154 @@
+"""
+STREAMING COVERAGE - Merge and gap detection over live window feeds
+===================================================================
+
+merge_intervals() and find_coverage_gaps() need the whole window list in
+memory. These generators consume an iterator of (start, end) windows that
+arrives (roughly) in start-time order from the propagator and emit merged
+coverage periods and gaps as soon as they are final.
+
+Out-of-order tolerance / watermark:
+    Windows may arrive up to `tolerance` time units earlier (by start) than
+    the latest start already seen. The watermark is
+
+        watermark = latest start seen - tolerance
+
+    Nothing can start before the watermark any more, so buffered windows
+    starting at or before it are released in order, and an open period
+    ending before it can never grow again and is emitted.
+
+Memory: the buffer holds only windows inside the tolerance horizon plus
+the one open period - independent of stream length.
+
+USE CASE: Coverage monitoring straight off the propagator, no batch step
+"""
+
+import heapq
+from typing import Iterable, Iterator, Optional, Tuple
+
+Window = Tuple[float, float]
+
+
+class LateWindowError(ValueError):
+    """A window arrived further out of order than the tolerance allows."""
+
+
+def stream_merge(windows: Iterable[Window], tolerance: float = 0,
+                 on_late: str = 'raise') -> Iterator[Window]:
+    """
+    Yield merged coverage periods from a start-ordered window stream.
+
+    Args:
+        windows: iterable of (start, end); extra fields are ignored
+        tolerance: how far (in start time) a window may arrive out of order
+        on_late: 'raise' (LateWindowError) or 'drop' for windows that
+                 arrive behind the watermark
+
+    Yields:
+        (start, end) periods in order - the same periods merge_intervals()
+        returns for the whole stream, each emitted once final
+
+    Time Complexity: O(n log k) for k windows within the tolerance horizon
+    Space Complexity: O(k)
+    """
+    if on_late not in ('raise', 'drop'):
+        raise ValueError("on_late must be 'raise' or 'drop'")
+
+    pending = []            # Min-heap of buffered (start, end)
+    watermark = None
+    current = None          # Open period [start, end]
+
+    for window in windows:
+        start, end = window[0], window[1]
+        if watermark is not None and start < watermark:
+            if on_late == 'raise':
+                raise LateWindowError(
+                    f"window starting at {start} arrived behind watermark {watermark}")
+            continue
+
+        heapq.heappush(pending, (start, end))
+        candidate = start - tolerance
+        if watermark is None or candidate > watermark:
+            watermark = candidate
+
+        # Release every buffered window that can no longer be preceded
+        while pending and pending[0][0] <= watermark:
+            start, end = heapq.heappop(pending)
+            if current is not None and start <= current[1]:
+                if end > current[1]:
+                    current = (current[0], end)
+            else:
+                if current is not None:
+                    yield current
+                current = (start, end)
+
+        # Close the open period once nothing can reach it any more
+        if current is not None and current[1] < watermark:
+            yield current
+            current = None
+
+    # End of stream: everything left is final
+    while pending:
+        start, end = heapq.heappop(pending)
+        if current is not None and start <= current[1]:
+            if end > current[1]:
+                current = (current[0], end)
+        else:
+            if current is not None:
+                yield current
+            current = (start, end)
+    if current is not None:
+        yield current
+
+
+def stream_gaps(windows: Iterable[Window], required_start: float,
+                required_end: Optional[float] = None, tolerance: float = 0,
+                on_late: str = 'raise') -> Iterator[Window]:
+    """
+    Yield coverage gaps within [required_start, required_end] as soon as
+    each one is known to be final.
+
+    Args:
+        windows: start-ordered (within tolerance) stream of (start, end)
+        required_start: when coverage should begin
+        required_end: when coverage should end; None for an open-ended
+                      stream (no trailing gap is reported)
+        tolerance, on_late: see stream_merge
+
+    Yields:
+        (gap_start, gap_end), clipped to the required window. Stops
+        consuming the stream once coverage reaches required_end.
+    """
+    position = required_start
+    for start, end in stream_merge(windows, tolerance, on_late):
+        if required_end is not None and start > required_end:
+            break
+        if start > position:
+            yield (position, start)
+        if end > position:
+            position = end
+        if required_end is not None and position >= required_end:
+            return
+    if required_end is not None and position < required_end:
+        yield (position, required_end)
+
+
+if __name__ == "__main__":
+    import random
+
+    from note import find_coverage_gaps, merge_intervals
+
+    # Propagator feed: roughly ordered, jittered by up to 30s
+    random.seed(3)
+    feed = []
+    t = 0
+    for _ in range(10_000):
+        t += random.uniform(0, 200)
+        feed.append((t, t + random.uniform(60, 300)))
+    jittered = sorted(feed, key=lambda w: w[0] + random.uniform(0, 30))
+
+    merged = list(stream_merge(iter(jittered), tolerance=30))
+    assert merged == merge_intervals(list(feed))
+    gaps = list(stream_gaps(iter(jittered), 0, t, tolerance=30))
+    print(f"{len(feed)} windows -> {len(merged)} periods, {len(gaps)} gaps")
+    print(f"First gaps: {[(round(a), round(b)) for a, b in gaps[:3]]}")
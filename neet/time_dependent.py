@@ -0,0 +1,227 @@
+"""
+TIME-DEPENDENT ROUTING - Earliest arrival across changing topology
+==================================================================
+
+A flow that lives longer than one topology epoch crosses links that come
+and go. Instead of copying every node once per timestep (a time-expanded
+graph - O(V * T) memory), each link keeps its latency plus the list of
+(start, end) windows in which it exists, merged with merge_intervals().
+
+Dijkstra then runs on ARRIVAL TIME: from u at time t, a link can be taken
+at the earliest departure t' >= t inside one of its windows such that the
+signal arrives before the window closes (t' + latency <= end). With
+store-and-forward waiting allowed, arrival times are FIFO (leaving later
+never gets you there earlier), so the greedy label-setting search is exact.
+
+Memory: O(V + E + total windows), independent of the number of timesteps.
+
+USE CASE: Route a long-lived flow or a delay-tolerant bundle through a
+moving constellation
+"""
+
+import heapq
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from note import INF, CSRGraph, merge_intervals
+
+
+class TemporalGraph:
+    """
+    Links with constant latency and availability windows.
+
+    _edges[u] = [(v, latency, starts, ends), ...] with each link's windows
+    merged and sorted so lookups are a binary search.
+    """
+
+    def __init__(self):
+        self._edges = defaultdict(list)
+        self.last_change = -INF  # Last finite window boundary
+
+    def add_edge(self, u: Hashable, v: Hashable, latency: float,
+                 windows: Iterable[Tuple[float, float]]) -> None:
+        """Add link u -> v that exists during the given (start, end) windows."""
+        merged = merge_intervals(list(windows))
+        if not merged:
+            return
+        starts = [start for start, _ in merged]
+        ends = [end for _, end in merged]
+        for boundary in (starts[-1], ends[-1]):
+            if boundary != INF:
+                self.last_change = max(self.last_change, boundary)
+        self._edges[u].append((v, latency, starts, ends))
+
+    @classmethod
+    def from_snapshots(cls, snapshots: Sequence[Tuple[float, Dict]],
+                       horizon: float = INF) -> 'TemporalGraph':
+        """
+        Build from an ordered series of (valid_from, graph) snapshots.
+
+        Snapshot i is in force from its valid_from until the next one's
+        (the last until `horizon`). A link present with the same latency in
+        consecutive snapshots becomes ONE window, so a mostly-static mesh
+        costs about as much as a single snapshot.
+        """
+        windows = defaultdict(list)  # (u, v, latency) -> [(start, end), ...]
+        for i, (valid_from, graph) in enumerate(snapshots):
+            valid_to = snapshots[i + 1][0] if i + 1 < len(snapshots) else horizon
+            if valid_to <= valid_from:
+                raise ValueError("snapshots must be in increasing time order")
+            if isinstance(graph, CSRGraph):
+                graph = graph.to_adjacency()
+            for u, neighbors in graph.items():
+                for v, latency in neighbors:
+                    windows[(u, v, latency)].append((valid_from, valid_to))
+
+        temporal = cls()
+        for (u, v, latency), spans in windows.items():
+            temporal.add_edge(u, v, latency, spans)
+        return temporal
+
+    def num_windows(self) -> int:
+        return sum(len(starts) for edges in self._edges.values()
+                   for _, _, starts, _ in edges)
+
+
+def _departure(starts: List[float], ends: List[float], t: float,
+               latency: float, wait: bool) -> Optional[float]:
+    """Earliest departure >= t from which the link is up until arrival."""
+    i = bisect_left(ends, t + latency)
+    while i < len(ends):
+        depart = max(t, starts[i])
+        if depart + latency <= ends[i]:
+            return depart if wait or depart == t else None
+        if not wait:
+            return None
+        i += 1
+    return None
+
+
+def _search(temporal: TemporalGraph, start: Hashable, depart_time: float,
+            end: Optional[Hashable], wait: bool):
+    """
+    Label-setting search on arrival time.
+
+    With waiting, arrival is FIFO and each node is settled once. Without
+    waiting it is not (arriving later can catch a link that arriving early
+    misses), so the search settles (node, time) states instead; once the
+    topology stops changing (last_change) the first such state per node
+    dominates the rest, which keeps the state space finite.
+
+    Returns:
+        (first_arrival, previous, end_state)
+        first_arrival: {node: earliest arrival}
+        previous: {state: (previous_state, departure, arrival)}; a state is
+                  the node itself with waiting, (node, time) without
+    """
+    first_arrival = {}
+    previous = {}
+    static = set()  # Nodes already settled at or after last_change
+    labels = {start: depart_time}
+    settled = set()
+    queue = [(depart_time, 0, start, start if wait else (start, depart_time))]
+    counter = 1  # Tie-breaker: node IDs need not be comparable
+    edges = temporal._edges
+    last_change = temporal.last_change
+
+    while queue:
+        t, _, u, state = heapq.heappop(queue)
+        if state in settled:
+            continue
+        if not wait and t >= last_change:
+            if u in static:
+                continue
+            static.add(u)
+        settled.add(state)
+        first_arrival.setdefault(u, t)
+        if u == end:
+            return first_arrival, previous, state
+
+        for v, latency, starts, ends in edges.get(u, ()):
+            depart = _departure(starts, ends, t, latency, wait)
+            if depart is None:
+                continue
+            reached = depart + latency
+            if wait:
+                if reached >= labels.get(v, INF):
+                    continue
+                labels[v] = reached
+                following = v
+            else:
+                following = (v, reached)
+                if following in settled or following in previous:
+                    continue
+            previous[following] = (state, depart, reached)
+            heapq.heappush(queue, (reached, counter, v, following))
+            counter += 1
+
+    return first_arrival, previous, None
+
+
+def earliest_arrival(temporal: TemporalGraph, start: Hashable,
+                     depart_time: float = 0, wait: bool = True) -> Dict[Hashable, float]:
+    """
+    Earliest arrival time at every reachable node, leaving start at
+    depart_time - the time-dependent analogue of dijkstra().
+
+    Args:
+        wait: allow holding data at a node until a link comes up
+              (store-and-forward). With wait=False a link must be up at the
+              moment the data arrives.
+    """
+    first_arrival, _, _ = _search(temporal, start, depart_time, None, wait)
+    return first_arrival
+
+
+def earliest_arrival_path(temporal: TemporalGraph, start: Hashable, end: Hashable,
+                          depart_time: float = 0,
+                          wait: bool = True) -> Tuple[float, List[Hashable]]:
+    """
+    (arrival_time, path) - same shape as dijkstra_with_path, but the first
+    element is when the data reaches end. (float('inf'), []) if it never does.
+    """
+    arrival, journey = earliest_arrival_journey(temporal, start, end, depart_time, wait)
+    if not journey:
+        return (arrival, [start] if arrival != INF else [])
+    return (arrival, [journey[0][0]] + [leg[1] for leg in journey])
+
+
+def earliest_arrival_journey(temporal: TemporalGraph, start: Hashable, end: Hashable,
+                             depart_time: float = 0, wait: bool = True
+                             ) -> Tuple[float, List[Tuple[Hashable, Hashable, float, float]]]:
+    """
+    Earliest arrival plus the timed legs taken:
+    (arrival_time, [(from, to, depart, arrive), ...])
+    """
+    if start == end:
+        return (depart_time, [])
+    first_arrival, previous, state = _search(temporal, start, depart_time, end, wait)
+    if state is None:
+        return (float('inf'), [])
+
+    node_of = (lambda state: state) if wait else (lambda state: state[0])
+    legs = []
+    while state in previous:
+        before, depart, reached = previous[state]
+        legs.append((node_of(before), node_of(state), depart, reached))
+        state = before
+    legs.reverse()
+    return (first_arrival[end], legs)
+
+
+if __name__ == "__main__":
+    # Three snapshots of a 4-satellite chain: the 2-3 link drops at t=100
+    # and a 1-4 cross-link appears at t=200
+    chain = {1: [(2, 10)], 2: [(1, 10), (3, 10)], 3: [(2, 10), (4, 10)], 4: [(3, 10)]}
+    broken = {1: [(2, 10)], 2: [(1, 10)], 3: [(4, 10)], 4: [(3, 10)]}
+    crossed = {1: [(2, 10), (4, 40)], 2: [(1, 10)], 3: [(4, 10)], 4: [(3, 10), (1, 40)]}
+
+    temporal = TemporalGraph.from_snapshots([(0, chain), (100, broken), (200, crossed)],
+                                            horizon=1000)
+    print(f"{temporal.num_windows()} link windows for 3 snapshots")
+
+    for t0 in (0, 95, 150):
+        arrival, legs = earliest_arrival_journey(temporal, 1, 4, t0)
+        hops = ', '.join(f"{u}->{v} @{d}-{a}" for u, v, d, a in legs)
+        print(f"Leave SAT1 at t={t0}: reach SAT4 at t={arrival} via {hops}")